@@ -1,14 +1,553 @@
+import array
+import copy
+import functools
+import hashlib
+import itertools
 import json
+import logging
+import os
+import pickle
+import re
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from types import MappingProxyType, SimpleNamespace
 # Attempt to import decode from iab_tcf. If the library is not installed,
 # the script will fail here, which is expected.
 try:
-    from iab_tcf import decode
+    from iab_tcf import ConsentV2, Reader, base64_decode, decode, decode_v1, segments, version
 except ImportError:
     print("ERROR: The 'iab-tcf' library is not installed.")
     print("Please install it using: pip install iab-tcf")
     exit(1)
 
+
+def _read_bitfield(reader: Reader, n: int) -> dict:
+    """
+    Reads an n-bit bitfield like Reader.read_bitfield, but with one bitarray slice
+    instead of a slice and a Python call per bit. Vendor bitfields run to thousands
+    of bits, which made them the bulk of decoding time.
+
+    Args:
+        reader (Reader): The bit reader, positioned at the start of the bitfield.
+        n (int): Number of bits to read.
+
+    Returns:
+        dict: Bit position (starting at 1) -> bool, exactly as Reader.read_bitfield.
+    """
+    bits = reader.read_bits(n)
+    values = map(bool, bits.tolist())
+    if len(bits) < n:
+        # Reader.read_bool reports True for bits past the end of a truncated string
+        values = itertools.chain(values, itertools.repeat(True, n - len(bits)))
+    return dict(zip(range(1, n + 1), values))
+
+
+class _ConsentV2(ConsentV2):
+    """ConsentV2 reading its vendor consent and LI bitfields with _read_bitfield."""
+
+    def read_consent_vendors(self):
+        reader = self._reader
+        self.max_consent_vendor_id = reader.read_int(16)
+        self.is_consent_range_encoding = reader.read_bool()
+        if self.is_consent_range_encoding:
+            self.num_consent_entries = reader.read_int(12)
+            self.consented_vendors_range = reader.read_range(self.num_consent_entries)
+        else:
+            self.consented_vendors = _read_bitfield(reader, self.max_consent_vendor_id)
+
+    def read_interest_vendors(self):
+        reader = self._reader
+        self.max_interests_vendor_id = reader.read_int(16)
+        self.is_interests_range_encoding = reader.read_bool()
+        if self.is_interests_range_encoding:
+            self.num_interests_entries = reader.read_int(12)
+            self.interests_vendors_range = reader.read_range(self.num_interests_entries)
+        else:
+            self.interests_vendors = _read_bitfield(reader, self.max_interests_vendor_id)
+
+
+def _decode_v2(consent_string: str):
+    """Decodes a v2 string, as iab_tcf.decode_v2 does but with _ConsentV2."""
+    consent_segments = segments(consent_string)
+    consent = _ConsentV2(base64_decode(consent_segments[0]))
+    consent.read_non_core_segments(consent_segments)
+    return consent
+
+
+def _decode_v1_core(consent_string: str):
+    """Decodes a v1.1 string's core segment, as iab_tcf.decode does."""
+    return decode_v1(segments(consent_string)[0])
+
+
+# The TCF version is the first 6 bits of the core segment, i.e. exactly its first
+# base64 character ('B' = 1, 'C' = 2). Dispatching on it skips the extra base64
+# decode and bit reader iab_tcf.decode builds just to read the version.
+_DECODERS_BY_PREFIX = {'B': _decode_v1_core, 'C': _decode_v2}
+
+
+def _decode(consent_string: str):
+    """
+    Decodes a TCF consent string like iab_tcf.decode, dispatching on the version
+    character directly. Anything else goes through iab_tcf.decode, which raises
+    the usual errors.
+    """
+    return _DECODERS_BY_PREFIX.get(consent_string[:1], decode)(consent_string)
+
+
+# Cheap shape check run before any decoding: one or more non-empty, dot-separated
+# base64 segments (URL-safe or standard alphabet, optionally padded), the core
+# one at least 20 characters long (even the shortest core header needs more bits
+# than that). Surrounding whitespace is ignored. This is stricter than iab_tcf,
+# whose base64 decoding silently drops any other characters: strings with stray
+# characters or empty segments are rejected here rather than decoded.
+_TCF_RE = re.compile(r'\s*[A-Za-z0-9_\-+/]{20,}={0,2}(?:\.[A-Za-z0-9_\-+/]+={0,2})*\s*')
+
+
+def _is_well_formed(consent_string) -> bool:
+    """Whether consent_string is a string passing the _TCF_RE shape check."""
+    return isinstance(consent_string, str) and _TCF_RE.fullmatch(consent_string) is not None
+
+logger = logging.getLogger(__name__)
+
+# Logger for TCFProcessor(verbose=True) instances only; the module logger's level
+# stays under the application's control
+_verbose_logger = logger.getChild('verbose')
+
+
+def _enable_verbose_logging() -> logging.Logger:
+    """
+    Returns the logger for verbose instances, setting it up on first use: a child of
+    the module logger that logs at DEBUG. Adds a stderr handler only if logging
+    hasn't been configured, so application handlers are kept.
+    """
+    if _verbose_logger.level != logging.DEBUG:
+        _verbose_logger.setLevel(logging.DEBUG)
+        if not _verbose_logger.hasHandlers():
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter('%(levelname)s: %(message)s'))
+            _verbose_logger.addHandler(handler)
+    return _verbose_logger
+
+# orjson and msgspec are optional: either parses the large GVL file considerably
+# faster than the stdlib json module. orjson's JSONDecodeError subclasses
+# json.JSONDecodeError; msgspec raises its own DecodeError.
+_JSON_DECODE_ERRORS = (json.JSONDecodeError,)
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    try:
+        import msgspec
+        _json_loads = msgspec.json.Decoder().decode
+        _JSON_DECODE_ERRORS = (json.JSONDecodeError, msgspec.DecodeError)
+    except ImportError:
+        _json_loads = json.loads
+
+# numpy is optional: when available, consented vendor IDs are also exposed as a
+# numpy int32 array for vectorized consumers.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# --- Vendor Details ---
+
+# Fields returned by TCFProcessor._get_vendor_details, in output order, with the
+# defaults used when missing from the vendor's GVL entry.
+_VENDOR_DETAIL_DEFAULTS = MappingProxyType({
+    'id': None,
+    'name': 'unknown',
+    'purposes': (),
+    'legIntPurposes': (),
+    'flexiblePurposes': (),
+    'specialPurposes': (),
+    'features': (),
+    'specialFeatures': (),
+    'policyUrl': '',
+    'cookieMaxAgeSeconds': None,
+    'usesCookies': False,
+    'cookieRefresh': False,
+    'usesNonCookieAccess': False,
+    'deviceStorageDisclosureUrl': ''
+})
+
+# Detail fields defaulting to an empty list; the () placeholders above keep the
+# shared defaults immutable, and each details dict gets its own plain list instead
+_VENDOR_DETAIL_LIST_FIELDS = tuple(
+    key for key, default in _VENDOR_DETAIL_DEFAULTS.items() if default == ()
+)
+
+
+# GVL vendor string fields whose values repeat across vendors (shared policy and
+# disclosure URLs, deletion dates); interned on load so duplicates share one object
+_INTERNED_VENDOR_FIELDS = ('policyUrl', 'deviceStorageDisclosureUrl', 'deletedDate')
+
+
+def _build_vendor_details(vendor_id: int, vendor_gvl_data: dict) -> dict:
+    """
+    Builds the formatted details dictionary for a vendor found in the GVL.
+
+    Args:
+        vendor_id (int): The integer vendor ID, used if the entry has no 'id'.
+        vendor_gvl_data (dict): The vendor's data dictionary from the GVL.
+
+    Returns:
+        dict: The vendor's fields from _VENDOR_DETAIL_DEFAULTS, with defaults for
+              missing fields. Values are plain JSON types (missing ID lists are []).
+    """
+    # Merge the GVL entry's known fields over the defaults in one step; the
+    # defaults' key order is kept, and extra GVL fields (e.g. 'overflow') are dropped
+    details = _VENDOR_DETAIL_DEFAULTS | {
+        key: vendor_gvl_data[key]
+        for key in vendor_gvl_data.keys() & _VENDOR_DETAIL_DEFAULTS.keys()
+    } | {'id': vendor_gvl_data.get('id', vendor_id)} # Prefer GVL ID, fallback to input ID
+    for field in _VENDOR_DETAIL_LIST_FIELDS:
+        if field not in vendor_gvl_data:
+            details[field] = []
+    return details
+
+
+def _copy_if_list(value):
+    """Returns a shallow copy of value if it is a list, otherwise value itself."""
+    return value[:] if type(value) is list else value
+
+
+def _copy_vendor_details(details: dict) -> dict:
+    """
+    Copies a prebuilt vendor details dict for handing out to a caller. Its ID lists
+    are the cached GVL's own (shared by every instance), so they are copied too;
+    all other values are immutable.
+    """
+    copied = dict(details)
+    for field in _VENDOR_DETAIL_LIST_FIELDS:
+        copied[field] = _copy_if_list(copied[field])
+    return copied
+
+
+def _as_int_key(key):
+    """
+    Returns the int whose str() equals str(key), or None if there is none. Data file
+    keys and public ID arguments used to be matched as strings; converting only such
+    canonical forms (e.g. '755', not '0755' or 'lastUpdated') keeps those matches
+    the same now that lookups are keyed by int.
+    """
+    if type(key) is int:
+        return key
+    text = str(key)
+    try:
+        number = int(text)
+    except ValueError:
+        return None
+    return number if str(number) == text else None
+
+
+def _int_keyed(mapping: dict) -> dict:
+    """Re-keys a JSON object by int ID, skipping keys that aren't IDs (see _as_int_key)."""
+    return {
+        int_key: value for key, value in mapping.items()
+        if (int_key := _as_int_key(key)) is not None
+    }
+
+
+# --- Shared Data File Cache ---
+
+# If the caller opts in with an index cache directory, parsed data files are also
+# persisted there, so a new process can skip JSON parsing and index building.
+# Bump the version whenever the cached structures change shape.
+_INDEX_CACHE_SUFFIX = '.idx.pkl'
+_INDEX_CACHE_VERSION = 4
+
+
+def _index_cache_path(cache_dir: str, filepath: str) -> str:
+    """
+    Returns the index cache file path for a data file: its base name plus a hash of
+    its absolute path, so same-named files in different directories don't collide.
+    """
+    path_hash = hashlib.sha256(filepath.encode('utf-8', 'surrogateescape')).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{os.path.basename(filepath)}.{path_hash}{_INDEX_CACHE_SUFFIX}")
+
+
+def _read_index_cache(cache_dir: str, filepath: str, mtime_ns: int, size: int):
+    """
+    Reads the persisted index cache for a data file, if it matches the file.
+
+    Args:
+        cache_dir (str): The caller-chosen index cache directory.
+        filepath (str): Absolute path to the source JSON file.
+        mtime_ns (int): The source file's st_mtime_ns.
+        size (int): The source file's st_size.
+
+    Returns:
+        The cached payload, or None if there's no cache file or it is stale or unreadable.
+    """
+    cache_path = _index_cache_path(cache_dir, filepath)
+    try:
+        with open(cache_path, 'rb') as f:
+            cache_key, payload = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.debug("Ignoring unreadable index cache '%s': %s", cache_path, e)
+        return None
+    if cache_key != (_INDEX_CACHE_VERSION, filepath, mtime_ns, size):
+        return None
+    return payload
+
+
+def _write_index_cache(cache_dir: str, filepath: str, mtime_ns: int, size: int, payload) -> None:
+    """
+    Persists the index cache for a data file, creating the cache directory if
+    needed. Failures (e.g. a read-only directory) are logged and otherwise ignored.
+
+    Args:
+        cache_dir (str): The caller-chosen index cache directory.
+        filepath (str): Absolute path to the source JSON file.
+        mtime_ns (int): The source file's st_mtime_ns.
+        size (int): The source file's st_size.
+        payload: The picklable structures to cache.
+    """
+    cache_path = _index_cache_path(cache_dir, filepath)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write to a temporary file and rename, so readers never see a partial cache
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(((_INDEX_CACHE_VERSION, filepath, mtime_ns, size), payload), f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except Exception as e:
+        logger.debug("Could not write index cache '%s': %s", cache_path, e)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_gvl_cached(filepath: str, mtime_ns: int, size: int, index_cache_dir: str | None = None) -> tuple:
+    """
+    Parses a GVL JSON file once and caches the result across TCFProcessor instances.
+
+    The file's modification time and size are part of the cache key so an updated
+    GVL on disk is picked up automatically. Exceptions are not cached. If an index
+    cache directory is given, the parsed and transformed data is also persisted
+    there and reused by later processes while the GVL file is unchanged.
+
+    Args:
+        filepath (str): Absolute path to the GVL JSON file.
+        mtime_ns (int): The file's st_mtime_ns, used only as part of the cache key.
+        size (int): The file's st_size, used only as part of the cache key.
+        index_cache_dir (str | None): Directory for the persisted index cache, or
+                                      None (default) to not read or write one.
+
+    Returns:
+        tuple: (gvl_data, vendors, vendor_details, indexes) where vendors is a read-only
+               mapping of GVL vendors keyed by integer vendor ID, vendor_details maps
+               the same IDs to their prebuilt _build_vendor_details() dicts, and
+               indexes is an initially empty dict in which TCFProcessor memoizes
+               query indexes derived from this GVL, shared between instances.
+    """
+    cached = _read_index_cache(index_cache_dir, filepath, mtime_ns, size) if index_cache_dir else None
+    if cached is not None:
+        gvl_data, vendors, vendor_details = cached
+        return gvl_data, MappingProxyType(vendors), MappingProxyType(vendor_details), {}
+
+    # Read as bytes: orjson/msgspec require them and json.loads accepts UTF-8 bytes too
+    with open(filepath, 'rb') as f:
+        gvl_data = _json_loads(f.read())
+    # Assumes GVL structure has a top-level 'vendors' key mapped to a dict
+    # JSON object keys are numeric strings; key by int once so lookups by the
+    # integer IDs from the decoded consent need no str() conversion
+    vendors = _int_keyed(gvl_data.get('vendors', {}))
+    for vendor_gvl_data in vendors.values():
+        for field in _INTERNED_VENDOR_FIELDS:
+            value = vendor_gvl_data.get(field)
+            if type(value) is str:
+                vendor_gvl_data[field] = sys.intern(value)
+    # Format vendor details once per file rather than once per consented vendor per call
+    vendor_details = {
+        vid: _build_vendor_details(vid, v) for vid, v in vendors.items() if v
+    }
+    if index_cache_dir:
+        # Pickling keeps the shared (interned) objects shared on reload
+        _write_index_cache(index_cache_dir, filepath, mtime_ns, size, (gvl_data, vendors, vendor_details))
+    return gvl_data, MappingProxyType(vendors), MappingProxyType(vendor_details), {}
+
+
+@functools.lru_cache(maxsize=8)
+def _load_cmp_cached(filepath: str, mtime_ns: int, size: int, index_cache_dir: str | None = None) -> tuple:
+    """
+    Parses a CMP list JSON file once and caches the result across TCFProcessor instances.
+
+    Args:
+        filepath (str): Absolute path to the CMP List JSON file.
+        mtime_ns (int): The file's st_mtime_ns, used only as part of the cache key.
+        size (int): The file's st_size, used only as part of the cache key.
+        index_cache_dir (str | None): Directory for the persisted index cache, or
+                                      None (default) to not read or write one.
+
+    Returns:
+        tuple: (cmp_list_data, cmps) where cmps is a read-only mapping of CMPs keyed
+               by integer CMP ID, or None if the file doesn't contain a dictionary
+               of CMPs (at the root or under a 'cmps' key). Persisted to the
+               index cache directory, if given, like the GVL.
+    """
+    cached = _read_index_cache(index_cache_dir, filepath, mtime_ns, size) if index_cache_dir else None
+    if cached is not None:
+        cmp_list_data, cmps = cached
+        return cmp_list_data, (MappingProxyType(cmps) if cmps is not None else None)
+
+    # Read as bytes: orjson/msgspec require them and json.loads accepts UTF-8 bytes too
+    with open(filepath, 'rb') as f:
+        cmp_list_data = _json_loads(f.read())
+
+    cmps = None
+    if isinstance(cmp_list_data, dict):
+        # Check if data is nested under 'cmps' key, otherwise assume root is the dict
+        potential_dict = cmp_list_data.get('cmps', cmp_list_data)
+        if isinstance(potential_dict, dict):
+            # Key by int, matching the cmp_id decoded from the consent string; other
+            # keys (e.g. 'lastUpdated' when the root object is the CMP dict) are skipped
+            cmps = _int_keyed(potential_dict)
+    if index_cache_dir:
+        _write_index_cache(index_cache_dir, filepath, mtime_ns, size, (cmp_list_data, cmps))
+    return cmp_list_data, (MappingProxyType(cmps) if cmps is not None else None)
+
+
+# --- Metadata Field Conversion ---
+
+# (consent object attribute, metadata output key) pairs returned by get_metadata
+_METADATA_FIELDS = (
+    ('version', 'tcf_version'),
+    ('created', 'created'),
+    ('last_updated', 'last_updated'),
+    ('cmp_id', 'cmp_id'),
+    ('cmp_version', 'cmp_version'),
+    ('consent_screen', 'consent_screen'),
+    ('vendor_list_version', 'vendor_list_version'),
+    ('tcf_policy_version', 'tcf_policy_version'),
+    ('consent_language', 'consent_language'),
+    ('publisher_cc', 'publisher_cc'),
+    ('is_service_specific', 'is_service_specific'),
+    ('purpose_one_treatment', 'purpose_one_treatment'),
+    ('use_non_standard_stacks', 'use_non_standard_stacks')
+    # Add other relevant fields from the consent object if needed
+)
+
+
+def _datetime_to_iso(val: datetime) -> str:
+    """Formats a datetime as an ISO string in UTC, falling back to str() if out of range."""
+    try:
+        return val.astimezone(timezone.utc).isoformat()
+    except (ValueError, OSError):
+        # Fallback for problematic timestamps (e.g., out of range)
+        return str(val)
+
+
+def _bytes_to_str(val: bytes) -> str:
+    """Decodes bytes as UTF-8, replacing invalid characters."""
+    try:
+        return val.decode('utf-8', errors='replace')
+    except Exception as decode_err:
+        # Fallback if decoding fails
+        logger.warning("Could not decode bytes metadata value: %s", decode_err)
+        return f"<bytes: {len(val)} bytes>"
+
+
+def _identity(val):
+    """Returns the value unchanged (int, bool, str, None)."""
+    return val
+
+
+# Converters for metadata values that aren't JSON serializable, keyed by exact type
+_METADATA_CONVERTERS = {
+    datetime: _datetime_to_iso,
+    bytes: _bytes_to_str
+}
+
+
+def _coerce_metadata_value(val):
+    """Converts a consent object attribute value into a JSON-friendly metadata value."""
+    return _METADATA_CONVERTERS.get(type(val), _identity)(val)
+
+
+def _decode_core_header(consent_string: str) -> SimpleNamespace:
+    """
+    Parses only the fixed-size header of the core segment, i.e. the fields
+    get_metadata and get_cmp_details need, without decoding the vendor bitfields,
+    publisher restrictions or non-core segments. Reads fields in the same order
+    and with the same Reader as iab_tcf's ConsentV1/ConsentV2.
+
+    Args:
+        consent_string (str): The TCF consent string. Must not be empty.
+
+    Returns:
+        SimpleNamespace: The header fields, named as on the decoded consent object.
+
+    Raises:
+        Exception: If the string is not valid base64 or has an unsupported version,
+                   mirroring iab_tcf.decode.
+    """
+    consent_segments = segments(consent_string)
+    core = base64_decode(consent_segments[0])
+    consent_version = version(core)
+    if consent_version not in (1, 2):
+        raise Exception(f"Unable to process a consent with version {consent_version}")
+    if consent_version == 2:
+        # decode_v2 base64-decodes every segment; fail on the same inputs it does
+        for segment in consent_segments[1:]:
+            base64_decode(segment)
+
+    reader = Reader(core)
+    header = SimpleNamespace(
+        version=reader.read_int(6),
+        created=reader.read_time(),
+        last_updated=reader.read_time(),
+        cmp_id=reader.read_int(12),
+        cmp_version=reader.read_int(12),
+        consent_screen=reader.read_int(6),
+        consent_language=reader.read_string(2),
+        vendor_list_version=reader.read_int(12),
+    )
+    if consent_version == 2:
+        header.tcf_policy_version = reader.read_int(6)
+        header.is_service_specific = reader.read_bool()
+        header.use_non_standard_stacks = reader.read_bool()
+        # Skip special_features_optin (12), purposes_consent (24), purposes_legitimate_interests (24)
+        reader.read_bits(60)
+        header.purpose_one_treatment = reader.read_bool()
+        header.publisher_cc = reader.read_string(2)
+    return header
+
+
+def _expand_gvl_list_matches(matches: tuple) -> dict:
+    """
+    Builds the GVL list filter result from its cached (vendor ID, name, matched IDs)
+    tuples, with new dicts and lists on every call so callers can't alter the cache.
+    """
+    return {
+        vendor_id: {'name': name, 'matched_ids': list(matched_ids)}
+        for vendor_id, name, matched_ids in matches
+    }
+
+
+# Shared empty declaration set for vendors missing from a GVL list index
+_EMPTY_IDS = frozenset()
+
+# TCFProcessor.batch_filters spec types for GVL list filters, mapped to the GVL
+# key they check (same as the get_consented_vendors_for_<type> methods)
+_BATCH_FILTER_LIST_KEYS = MappingProxyType({
+    'purposes': 'purposes',
+    'special_purposes': 'specialPurposes',
+    'features': 'features',
+    'special_features': 'specialFeatures',
+    'flexible_purposes': 'flexiblePurposes'
+})
+
+
 class TCFProcessor:
     """
     Processes an IAB TCF consent string using associated Global Vendor List (GVL)
@@ -22,20 +561,57 @@ class TCFProcessor:
         consent_string (str): The TCF consent string being processed.
         gvl_filepath (str): Path to the GVL JSON file.
         cmp_list_filepath (str): Path to the CMP List JSON file.
-        gvl_data (dict | None): Raw data loaded from the GVL file.
-        gvl_vendors_dict (dict): Vendors from GVL, keyed by string vendor ID.
-        cmp_list_data (dict | None): Raw data loaded from the CMP list file.
-        cmp_list_dict (dict): CMPs from the CMP list, keyed by string CMP ID.
+        gvl_data (dict | None): Raw data loaded from the GVL file. Loaded on first access.
+        gvl_vendors_dict (dict): Vendors from GVL, keyed by integer vendor ID.
+        cmp_list_data (dict | None): Raw data loaded from the CMP list file. Loaded on first access.
+        cmp_list_dict (dict): CMPs from the CMP list, keyed by integer CMP ID.
+
+        The files are parsed once per process and shared by all instances; these four
+        attributes are each instance's own deep copy, made on first access, so
+        mutating them affects neither other instances nor query results.
         consent_object (ConsentV1 | ConsentV2 | None): The decoded object from iab_tcf.decode.
-        error_state (str | None): Stores critical error messages from initialization (e.g., decode failure).
+                                                      Decoded lazily on first access.
+        error_state (str | None): Stores critical error messages from decoding (e.g., decode failure).
+                                  Accessing it also triggers the decode.
     """
 
+    # Fixed attribute layout: no per-instance __dict__, which matters when one
+    # processor is created per consent string in a high-volume service. Every
+    # attribute, including lazily built caches, must be listed here.
+    __slots__ = (
+        'consent_string',
+        'gvl_filepath',
+        'cmp_list_filepath',
+        'index_cache_dir',
+        '_gvl',
+        '_cmp_list',
+        '_consent_object',
+        '_error_state',
+        '_decoded',
+        '_ready',
+        '_core_header',
+        '_consented_ids',
+        '_consented_ids_sorted',
+        '_li_ids',
+        '_consented_id_array',
+        '_consented_mask',
+        '_metadata_cache',
+        '_cmp_details_cache',
+        '_vendor_urls_cache',
+        '_query_cache',
+        '_data_copies',
+        '_log'
+    )
+
     def __init__(self,
                  consent_string: str,
                  gvl_filepath: str = 'vendor-list.json',
-                 cmp_list_filepath: str = 'cmp-list.json'):
+                 cmp_list_filepath: str = 'cmp-list.json',
+                 verbose: bool = False,
+                 index_cache_dir: str | None = None):
         """
-        Initializes the TCFProcessor instance, loads data files, and decodes the string.
+        Initializes the TCFProcessor instance. Data files are loaded and the string
+        is decoded on first use.
 
         Args:
             consent_string (str): The TCF consent string to process. Can be None or empty.
@@ -43,122 +619,371 @@ class TCFProcessor:
                                 Defaults to 'vendor-list.json'.
             cmp_list_filepath (str): The path to the CMP List JSON file.
                                      Defaults to 'cmp-list.json'.
+            verbose (bool): If True, this instance logs its debug progress messages,
+                            through the '<module>.verbose' child logger set to DEBUG.
+                            Defaults to False: the instance logs through the module
+                            logger, whose level is left to the application's logging
+                            configuration. Other instances are never affected.
+            index_cache_dir (str | None): Directory in which to persist the parsed data
+                            files (as pickles) for faster startup of later processes.
+                            Only pass a directory that only trusted users can write
+                            to, as the files are unpickled. Defaults to None: no
+                            cache files are read or written.
         """
+        self._log = _enable_verbose_logging() if verbose else logger
         if not isinstance(consent_string, str):
              # Handle cases where None or non-string might be passed
              consent_string = ""
-             print("Warning: Consent string was not a string, treating as empty.")
+             self._log.warning("Consent string was not a string, treating as empty.")
 
         self.consent_string = consent_string
         self.gvl_filepath = gvl_filepath
         self.cmp_list_filepath = cmp_list_filepath
+        self.index_cache_dir = index_cache_dir
 
         # Initialize attributes
-        self.gvl_data = None
-        self.gvl_vendors_dict = {}
-        self.cmp_list_data = None
-        self.cmp_list_dict = {}
-        self.consent_object = None
-        self.error_state = None # Stores critical init errors
+        self._gvl = None # _load_gvl() result, loaded on first use
+        self._cmp_list = None # _load_cmp_list() result, loaded on first use
+        self._consent_object = None
+        self._error_state = None # Stores critical decode errors
+        self._decoded = False # Whether _decode_tcf has run
+        self._ready = False # Decoded without error and exposes vendor consents; see _is_ready
+        self._core_header = None # Header-only parse for metadata/CMP lookups before a full decode
+        self._consented_ids = frozenset() # Vendor IDs with consent, set after decoding
+        self._consented_ids_sorted = () # The same IDs in ascending order
+        self._li_ids = None # Vendor IDs with LI established, if the object exposes them
+        self._consented_id_array = None # Sorted int32 array of consented vendor IDs, built lazily
+        self._consented_mask = None # numpy bool array over GVL vendor IDs, built lazily
+        self._metadata_cache = None # get_metadata() result, built after decoding
+        self._cmp_details_cache = None # get_cmp_details() lookup result, built on first call
+        # Per-call caches are created on first use, so one-shot instances don't allocate them
+        self._vendor_urls_cache = None # Vendor ID -> get_vendor_urls() result
+        self._query_cache = None # (GVL list key, required IDs, require_all) -> filter result
+        self._data_copies = None # Attribute name -> this instance's copy of shared loaded data
+
+        # Data files are loaded and the consent string decoded on first use
+
+    @classmethod
+    def from_consent_strings(cls,
+                             consent_strings: list,
+                             gvl_filepath: str = 'vendor-list.json',
+                             cmp_list_filepath: str = 'cmp-list.json',
+                             index_cache_dir: str | None = None) -> list:
+        """
+        Creates one processor per consent string, all sharing a single load of the
+        GVL and CMP list. The files are stat'ed, looked up and (on failure) warned
+        about once for the whole batch instead of once per instance.
 
-        # Perform loading and decoding
-        self._load_gvl()
-        self._load_cmp_list()
-        self._decode_tcf() # Sets self.consent_object and potentially self.error_state
+        Args:
+            consent_strings (list): The TCF consent strings to process.
+            gvl_filepath (str): The path to the GVL JSON file (vendors).
+                                Defaults to 'vendor-list.json'.
+            cmp_list_filepath (str): The path to the CMP List JSON file.
+                                     Defaults to 'cmp-list.json'.
+            index_cache_dir (str | None): Opt-in directory for persisted parsed data,
+                                          as in TCFProcessor(). Defaults to None.
 
-    def _load_gvl(self):
+        Returns:
+            list: A TCFProcessor for each string, in input order.
+        """
+        if not consent_strings:
+            return []
+        first = cls(consent_strings[0], gvl_filepath, cmp_list_filepath, index_cache_dir=index_cache_dir)
+        gvl = first._get_gvl()
+        cmp_list = first._get_cmp_list()
+        processors = [first]
+        for consent_string in consent_strings[1:]:
+            processors.append(cls._from_loaded(
+                consent_string, gvl_filepath, cmp_list_filepath, index_cache_dir, gvl, cmp_list))
+        return processors
+
+    @classmethod
+    def _from_loaded(cls, consent_string, gvl_filepath, cmp_list_filepath, index_cache_dir, gvl, cmp_list):
+        """
+        Internal constructor for an instance that reuses already loaded
+        _load_gvl() and _load_cmp_list() results instead of loading the files itself.
+        """
+        processor = cls(consent_string, gvl_filepath, cmp_list_filepath, index_cache_dir=index_cache_dir)
+        processor._gvl = gvl
+        processor._cmp_list = cmp_list
+        return processor
+
+    @property
+    def consent_object(self):
+        """The decoded consent object, or None if decoding failed. Decodes on first access."""
+        if not self._decoded:
+            self._decode_tcf()
+        return self._consent_object
+
+    @property
+    def error_state(self):
+        """The critical decode error message, or None. Decodes on first access."""
+        if not self._decoded:
+            self._decode_tcf()
+        return self._error_state
+
+    # --- Lazily Loaded Data Files ---
+
+    def _get_gvl(self) -> tuple:
+        """Internal helper returning the _load_gvl() result, loading the GVL on first use."""
+        gvl = self._gvl
+        if gvl is None:
+            gvl = self._gvl = self._load_gvl()
+        return gvl
+
+    def _get_cmp_list(self) -> tuple:
+        """Internal helper returning the _load_cmp_list() result, loading the CMP list on first use."""
+        cmp_list = self._cmp_list
+        if cmp_list is None:
+            cmp_list = self._cmp_list = self._load_cmp_list()
+        return cmp_list
+
+    def _own_copy(self, name: str, shared):
+        """
+        Internal helper returning this instance's deep copy of shared loaded data,
+        made on first access. The loaded files are parsed once per process and
+        shared by every instance, so the public data attributes hand out copies:
+        changes made through one instance never reach another.
+        """
+        copies = self._data_copies
+        if copies is None:
+            copies = self._data_copies = {}
+        if name not in copies:
+            copies[name] = copy.deepcopy(shared)
+        return copies[name]
+
+    @property
+    def gvl_data(self):
+        """This instance's copy of the raw GVL file data, or None if loading failed."""
+        return self._own_copy('gvl_data', self._get_gvl()[0])
+
+    @property
+    def gvl_vendors_dict(self):
+        """This instance's copy of the GVL vendors keyed by integer vendor ID; empty if loading failed."""
+        return self._own_copy('gvl_vendors_dict', dict(self._get_gvl()[1]))
+
+    @property
+    def _gvl_vendors(self):
+        """Read-only GVL vendors keyed by integer vendor ID, shared per GVL file; never handed out."""
+        return self._get_gvl()[1]
+
+    @property
+    def _gvl_vendor_details(self):
+        """Prebuilt _get_vendor_details() output per GVL vendor."""
+        return self._get_gvl()[2]
+
+    @property
+    def _gvl_indexes(self):
+        """Query indexes derived from the GVL, built lazily and shared per GVL file."""
+        return self._get_gvl()[3]
+
+    @property
+    def cmp_list_data(self):
+        """This instance's copy of the raw CMP list file data, or None if loading failed."""
+        return self._own_copy('cmp_list_data', self._get_cmp_list()[0])
+
+    @property
+    def cmp_list_dict(self):
+        """This instance's copy of the CMPs keyed by integer CMP ID; empty if loading failed."""
+        return self._own_copy('cmp_list_dict', dict(self._get_cmp_list()[1]))
+
+    @property
+    def _cmps(self):
+        """Read-only CMPs keyed by integer CMP ID, shared per CMP list file; never handed out."""
+        return self._get_cmp_list()[1]
+
+    def _load_gvl(self) -> tuple:
         """
         Internal method to load the GVL data (vendors) from the specified file path.
-        Handles file not found and JSON decoding errors, storing results in instance attributes.
-        Prints warnings on failure but doesn't set the main error_state.
+        Handles file not found and JSON decoding errors.
+        Logs warnings (logger.warning) on failure but doesn't set the main error_state.
+        Parsed data and derived indexes are cached per (absolute path, mtime, size) and
+        shared by all instances, so repeated instances are cheap.
+
+        Returns:
+            tuple: (gvl_data, gvl_vendors_dict, vendor_details, indexes) as returned by
+                   _load_gvl_cached, or (None, {}, {}, {}) on failure.
         """
-        print(f"Attempting to load GVL data from '{self.gvl_filepath}'...")
+        self._log.debug("Attempting to load GVL data from '%s'...", self.gvl_filepath)
         try:
-            with open(self.gvl_filepath, 'r', encoding='utf-8') as f:
-                self.gvl_data = json.load(f)
-            # Assumes GVL structure has a top-level 'vendors' key mapped to a dict
-            self.gvl_vendors_dict = self.gvl_data.get('vendors', {})
-            # Ensure vendor keys are strings
-            self.gvl_vendors_dict = {str(k): v for k, v in self.gvl_vendors_dict.items()}
-            print(f"Successfully loaded GVL data. Found {len(self.gvl_vendors_dict)} vendors.")
+            # Key the shared cache by absolute path so differently spelled paths to
+            # the same file ('vendor-list.json', './vendor-list.json') share one entry
+            filepath = os.path.abspath(self.gvl_filepath)
+            st = os.stat(filepath)
+            gvl = _load_gvl_cached(filepath, st.st_mtime_ns, st.st_size, self.index_cache_dir)
+            self._log.debug("Successfully loaded GVL data. Found %d vendors.", len(gvl[1]))
+            return gvl
         except FileNotFoundError:
-            print(f"WARNING: GVL file '{self.gvl_filepath}' not found. Vendor details lookup will be limited.")
-            self.gvl_vendors_dict = {} # Ensure it's empty
-        except json.JSONDecodeError:
-            print(f"WARNING: Could not decode JSON from GVL file '{self.gvl_filepath}'. Check format. Vendor details lookup limited.")
-            self.gvl_vendors_dict = {}
+            self._log.warning("GVL file '%s' not found. Vendor details lookup will be limited.", self.gvl_filepath)
+        except _JSON_DECODE_ERRORS:
+            self._log.warning("Could not decode JSON from GVL file '%s'. Check format. Vendor details lookup limited.", self.gvl_filepath)
         except Exception as e:
-            print(f"WARNING: Unexpected error loading GVL '{self.gvl_filepath}': {e}. Vendor details lookup limited.")
-            self.gvl_vendors_dict = {}
+            self._log.warning("Unexpected error loading GVL '%s': %s. Vendor details lookup limited.", self.gvl_filepath, e)
+        return None, {}, {}, {}
 
-    def _load_cmp_list(self):
+    def _load_cmp_list(self) -> tuple:
         """
         Internal method to load the CMP list data from the specified file path.
-        Handles file not found and JSON decoding errors, storing results in instance attributes.
-        Prints warnings on failure. Assumes CMP data is keyed by string CMP ID,
-        potentially under a top-level 'cmps' key.
+        Handles file not found and JSON decoding errors.
+        Logs warnings (logger.warning) on failure. Assumes CMP data is keyed by numeric CMP ID,
+        potentially under a top-level 'cmps' key. Parsed data is cached per
+        (absolute path, mtime, size), so repeated instances are cheap.
+
+        Returns:
+            tuple: (cmp_list_data, cmp_list_dict), with cmp_list_dict empty if no
+                   dictionary of CMPs could be loaded.
         """
-        print(f"Attempting to load CMP list data from '{self.cmp_list_filepath}'...")
+        self._log.debug("Attempting to load CMP list data from '%s'...", self.cmp_list_filepath)
+        cmp_list_data = None
         try:
-            with open(self.cmp_list_filepath, 'r', encoding='utf-8') as f:
-                self.cmp_list_data = json.load(f)
+            filepath = os.path.abspath(self.cmp_list_filepath) # See _load_gvl
+            st = os.stat(filepath)
+            cmp_list_data, cmps = _load_cmp_cached(filepath, st.st_mtime_ns, st.st_size, self.index_cache_dir)
 
-            if isinstance(self.cmp_list_data, dict):
+            if isinstance(cmp_list_data, dict):
                  # Check if data is nested under 'cmps' key, otherwise assume root is the dict
-                 potential_dict = self.cmp_list_data.get('cmps', self.cmp_list_data)
-                 if isinstance(potential_dict, dict):
-                     # Ensure keys are strings
-                     self.cmp_list_dict = {str(k): v for k, v in potential_dict.items()}
-                     print(f"Successfully loaded CMP list data. Found {len(self.cmp_list_dict)} CMPs.")
-                 else:
-                     print(f"WARNING: Expected a dictionary of CMPs in '{self.cmp_list_filepath}' (potentially under 'cmps' key), but found type {type(potential_dict)}.")
-                     self.cmp_list_dict = {}
+                 potential_dict = cmp_list_data.get('cmps', cmp_list_data)
+                 if cmps is not None:
+                     self._log.debug("Successfully loaded CMP list data. Found %d CMPs.", len(cmps))
+                     return cmp_list_data, cmps
+                 self._log.warning("Expected a dictionary of CMPs in '%s' (potentially under 'cmps' key), but found type %s.", self.cmp_list_filepath, type(potential_dict))
             else:
-                 print(f"WARNING: CMP list file '{self.cmp_list_filepath}' does not contain a dictionary at the root.")
-                 self.cmp_list_dict = {}
+                 self._log.warning("CMP list file '%s' does not contain a dictionary at the root.", self.cmp_list_filepath)
 
         except FileNotFoundError:
-            print(f"WARNING: CMP list file '{self.cmp_list_filepath}' not found. CMP details lookup will fail.")
-            self.cmp_list_dict = {}
-        except json.JSONDecodeError:
-            print(f"WARNING: Could not decode JSON from CMP list file '{self.cmp_list_filepath}'. Check format. CMP details lookup fail.")
-            self.cmp_list_dict = {}
+            self._log.warning("CMP list file '%s' not found. CMP details lookup will fail.", self.cmp_list_filepath)
+        except _JSON_DECODE_ERRORS:
+            self._log.warning("Could not decode JSON from CMP list file '%s'. Check format. CMP details lookup fail.", self.cmp_list_filepath)
         except Exception as e:
-            print(f"WARNING: Unexpected error loading CMP list '{self.cmp_list_filepath}': {e}. CMP details lookup fail.")
-            self.cmp_list_dict = {}
+            self._log.warning("Unexpected error loading CMP list '%s': %s. CMP details lookup fail.", self.cmp_list_filepath, e)
+        return cmp_list_data, {}
 
     def _decode_tcf(self):
         """
-        Internal method to decode the TCF consent string using iab_tcf.decode.
+        Internal method to decode the TCF consent string using _decode, which
+        dispatches on the version character to _decode_v2 or _decode_v1_core and
+        falls back to iab_tcf.decode for anything else.
         Handles empty strings and decoding exceptions. Stores the result in
-        self.consent_object and sets self.error_state on critical failure.
+        self._consent_object and sets self._error_state on critical failure.
+        Runs once, on first access to consent_object or error_state.
         """
+        self._decoded = True
         if not self.consent_string:
             # Consider this a critical error for most operations
-            self.error_state = "Consent string is empty."
-            print(f"ERROR: {self.error_state}")
-            self.consent_object = None
+            self._error_state = "Consent string is empty."
+            self._log.error("%s", self._error_state)
+            self._consent_object = None
+            return
+        if not _is_well_formed(self.consent_string):
+            # Garbage input never reaches the decoder and its exception handling
+            self._error_state = "Failed to decode TCF string: not a well-formed TCF string (expected dot-separated base64 segments)."
+            self._log.error("%s", self._error_state)
+            self._consent_object = None
             return
 
-        print(f"\nAttempting to decode TCF string: '{self.consent_string[:50]}...'")
+        self._log.debug("Attempting to decode TCF string: '%s...'", self.consent_string[:50])
         try:
             # The core decoding step
-            self.consent_object = decode(self.consent_string)
-            print("--- DEBUG: Attributes of consent_object ---")
-            try:
-                # Option 1: Print all attributes
-                print(dir(self.consent_object))
-                # Option 2: Print attributes and their values (if reasonable)
-                # print(vars(self.consent_object))
-            except Exception as e:
-                print(f"Error inspecting object: {e}")
-            print("--- END DEBUG ---")
-            print("Successfully decoded TCF string.")
+            self._consent_object = _decode(self.consent_string)
+            if self._log.isEnabledFor(logging.DEBUG):
+                try:
+                    # Option 1: Log all attributes
+                    self._log.debug("Attributes of consent_object: %s", dir(self._consent_object))
+                    # Option 2: Log attributes and their values (if reasonable)
+                    # self._log.debug("%s", vars(self.consent_object))
+                except Exception as e:
+                    self._log.debug("Error inspecting object: %s", e)
+            self._log.debug("Successfully decoded TCF string.")
+            self._index_vendor_ids()
+            self._ready = hasattr(self._consent_object, 'consented_vendors')
         except Exception as e:
             # Catch general Exception as specific iab_tcf exceptions may not be importable
-            self.error_state = f"Failed to decode TCF string: {e}"
-            print(f"ERROR: {self.error_state}")
-            self.consent_object = None # Ensure object is None on failure
+            self._error_state = f"Failed to decode TCF string: {e}"
+            self._log.error("%s", self._error_state)
+            self._consent_object = None # Ensure object is None on failure
+
+    def _is_ready(self) -> bool:
+        """
+        Internal helper for the vendor query methods' guard: whether the string
+        decoded without error into an object exposing 'consented_vendors'. Checked
+        once per decode instead of re-testing the object in every call. Decodes on
+        first call.
+
+        Returns:
+            bool: True if vendor consent queries can be answered.
+        """
+        if not self._decoded:
+            self._decode_tcf()
+        return self._ready
+
+    def _index_vendor_ids(self):
+        """
+        Internal method to scan the decoded vendor bitfields once after decoding,
+        so query methods don't re-filter them on every call.
+
+        Sets self._consented_ids to the frozenset of vendor IDs with consent (and
+        self._consented_ids_sorted to the same IDs as a sorted tuple), and
+        self._li_ids to the frozenset of vendor IDs with Legitimate Interest
+        established. self._li_ids stays None when the consent object doesn't expose
+        an LI bitfield (e.g. range encoding), in which case LI is checked per vendor.
+        """
+        vendor_consents = getattr(self._consent_object, 'consented_vendors', None) or {}
+        self._consented_ids_sorted = tuple(sorted(
+            vendor_id for vendor_id, consented in vendor_consents.items() if consented
+        ))
+        self._consented_ids = frozenset(self._consented_ids_sorted)
+
+        vendor_interests = getattr(self._consent_object, 'interests_vendors', None)
+        if vendor_interests is not None:
+            self._li_ids = frozenset(
+                vendor_id for vendor_id, li in vendor_interests.items() if li
+            )
+
+    def _get_header_source(self):
+        """
+        Internal helper returning the object to read header fields (CMP ID, timestamps,
+        versions, etc.) from. Before the full decode has run, this is a header-only
+        parse of the core segment, so metadata-only consumers never decode vendor
+        bitfields. Falls back to the full decode if the string fails the _TCF_RE shape
+        check or the header can't be parsed, so errors are reported exactly as the
+        full decode reports them.
+
+        Returns:
+            SimpleNamespace | ConsentV1 | ConsentV2 | None: The header source, or None
+                  if decoding failed.
+        """
+        if not self._decoded and self.consent_string and _is_well_formed(self.consent_string):
+            if self._core_header is None:
+                try:
+                    self._core_header = _decode_core_header(self.consent_string)
+                except Exception:
+                    # Let the full decode record and log the failure
+                    return self.consent_object
+            return self._core_header
+        return self.consent_object
+
+    def _build_metadata(self, source) -> dict:
+        """
+        Internal method to convert the header fields of a decoded consent object
+        into a JSON-friendly dictionary (datetimes to ISO strings, bytes to str).
+        Called once per instance; get_metadata returns copies.
+
+        Args:
+            source: The decoded consent object or header-only parse to read from.
+
+        Returns:
+            dict: The metadata dictionary, including 'initialization_error' if set.
+        """
+        # Safely get each attribute, formatting dates and decoding bytes
+        metadata = {
+            out_key: _coerce_metadata_value(getattr(source, attr_name, None))
+            for attr_name, out_key in _METADATA_FIELDS
+        }
+
+        # Include initialization error in metadata if one occurred
+        if self._error_state:
+            metadata['initialization_error'] = self._error_state
+        return metadata
 
     def _get_vendor_gvl_data(self, vendor_id: int) -> dict:
         """
@@ -171,10 +996,190 @@ class TCFProcessor:
             dict: The vendor's data dictionary from the GVL, or an empty dictionary
                   if the GVL wasn't loaded or the vendor ID is not found.
         """
-        if not self.gvl_vendors_dict:
-            return {}
-        # GVL keys are strings
-        return self.gvl_vendors_dict.get(str(vendor_id), {})
+        # GVL keys are converted to int on load, so this is a single dict hit;
+        # null entries in the GVL are treated like missing vendors
+        return self._gvl_vendors.get(vendor_id) or {}
+
+    def _get_gvl_declared_masks(self, gvl_list_key: str) -> dict:
+        """
+        Internal helper returning, for a GVL list attribute, the IDs each vendor
+        declares as an int bitmask (bit N set if ID N is declared). An int takes a
+        fraction of the memory of a frozenset of the same small IDs. The index is
+        built on first use for a key and memoized for every instance sharing the
+        loaded GVL.
+
+        Args:
+            gvl_list_key (str): The key for the list attribute in the vendor's GVL data
+                                (e.g., 'purposes', 'specialFeatures', 'legIntPurposes').
+
+        Returns:
+            dict: Maps integer vendor IDs to the bitmask of their declared IDs.
+        """
+        masks = self._gvl_indexes.get(('masks', gvl_list_key))
+        if masks is None:
+            masks = {}
+            for vid, vendor_gvl_data in self._gvl_vendors.items():
+                mask = 0
+                for declared_id in (vendor_gvl_data.get(gvl_list_key, ()) if vendor_gvl_data else ()):
+                    if type(declared_id) is int and declared_id >= 0:
+                        mask |= 1 << declared_id
+                masks[vid] = mask
+            self._gvl_indexes[('masks', gvl_list_key)] = masks
+        return masks
+
+    def _get_gvl_inverted_index(self, gvl_list_key: str) -> dict:
+        """
+        Internal helper returning, for a GVL list attribute, the vendors declaring
+        each ID, so filters can combine whole vendor sets instead of testing every
+        consented vendor. Built on first use for a key and shared like
+        _get_gvl_declared_masks.
+
+        Args:
+            gvl_list_key (str): The key for the list attribute in the vendor's GVL data.
+
+        Returns:
+            dict: Maps each declared ID to a frozenset of integer vendor IDs.
+        """
+        inverted = self._gvl_indexes.get(('inverted', gvl_list_key))
+        if inverted is None:
+            vendors_by_id = {}
+            for vid, vendor_gvl_data in self._gvl_vendors.items():
+                if vendor_gvl_data:
+                    for declared_id in vendor_gvl_data.get(gvl_list_key, ()):
+                        vendors_by_id.setdefault(declared_id, set()).add(vid)
+            inverted = {declared_id: frozenset(vids) for declared_id, vids in vendors_by_id.items()}
+            self._gvl_indexes[('inverted', gvl_list_key)] = inverted
+        return inverted
+
+    def _get_gvl_flag_vendors(self, gvl_flag_key: str) -> frozenset:
+        """
+        Internal helper returning the vendors with a boolean GVL flag set to true.
+        Built on first use for a key and shared like _get_gvl_declared_masks.
+
+        Args:
+            gvl_flag_key (str): The key for the boolean flag in the vendor's GVL data.
+
+        Returns:
+            frozenset: Integer IDs of the vendors with the flag set.
+        """
+        flagged = self._gvl_indexes.get(('flag', gvl_flag_key))
+        if flagged is None:
+            flagged = frozenset(
+                vid for vid, vendor_gvl_data in self._gvl_vendors.items()
+                if vendor_gvl_data and vendor_gvl_data.get(gvl_flag_key, False)
+            )
+            self._gvl_indexes[('flag', gvl_flag_key)] = flagged
+        return flagged
+
+    def _get_gvl_vendor_names(self) -> list:
+        """
+        Internal helper returning GVL vendor names as a list indexed by vendor ID,
+        so filters resolve names by list indexing instead of per-vendor dict lookups.
+        Built on first use and shared like _get_gvl_declared_masks.
+
+        Returns:
+            list[str]: Name per vendor ID ('unknown' if the GVL entry has no name);
+                       '' for IDs not in the GVL.
+        """
+        names = self._gvl_indexes.get('names')
+        if names is None:
+            names = [''] * (max(self._gvl_vendors, default=-1) + 1)
+            for vid, vendor_gvl_data in self._gvl_vendors.items():
+                if vendor_gvl_data:
+                    names[vid] = vendor_gvl_data.get('name', 'unknown')
+            self._gvl_indexes['names'] = names
+        return names
+
+    # numpy variants of the indexes above: one bool array per vendor set, indexed by
+    # vendor ID, so filters combine them with vectorized & and | (numpy only)
+
+    def _vendor_ids_to_mask(self, vendor_ids):
+        """
+        Internal helper converting vendor IDs to a read-only numpy bool array over
+        the GVL vendor ID space (index = vendor ID). IDs outside the GVL are dropped,
+        since no GVL declaration can match them.
+
+        Args:
+            vendor_ids (Iterable[int]): The vendor IDs to set.
+
+        Returns:
+            numpy.ndarray: Bool array of length max GVL vendor ID + 1.
+        """
+        size = self._gvl_indexes.get('id_space')
+        if size is None:
+            size = self._gvl_indexes['id_space'] = max(self._gvl_vendors, default=-1) + 1
+        mask = np.zeros(size, dtype=np.bool_)
+        mask[[vid for vid in vendor_ids if 0 <= vid < size]] = True
+        mask.flags.writeable = False # Shared by every caller
+        return mask
+
+    def _get_gvl_vendor_masks(self, gvl_list_key: str) -> dict:
+        """
+        Internal helper returning _get_gvl_inverted_index as numpy bool arrays.
+        Built on first use for a key and shared like _get_gvl_declared_masks.
+
+        Args:
+            gvl_list_key (str): The key for the list attribute in the vendor's GVL data.
+
+        Returns:
+            dict: Maps each declared ID to a bool array over vendor IDs.
+        """
+        vendor_masks = self._gvl_indexes.get(('vendor_masks', gvl_list_key))
+        if vendor_masks is None:
+            vendor_masks = {
+                declared_id: self._vendor_ids_to_mask(vids)
+                for declared_id, vids in self._get_gvl_inverted_index(gvl_list_key).items()
+            }
+            self._gvl_indexes[('vendor_masks', gvl_list_key)] = vendor_masks
+        return vendor_masks
+
+    def _get_gvl_flag_mask(self, gvl_flag_key: str):
+        """
+        Internal helper returning _get_gvl_flag_vendors as a numpy bool array.
+        Built on first use for a key and shared like _get_gvl_declared_masks.
+
+        Args:
+            gvl_flag_key (str): The key for the boolean flag in the vendor's GVL data.
+
+        Returns:
+            numpy.ndarray: Bool array over vendor IDs, True where the flag is set.
+        """
+        flag_mask = self._gvl_indexes.get(('flag_mask', gvl_flag_key))
+        if flag_mask is None:
+            flag_mask = self._vendor_ids_to_mask(self._get_gvl_flag_vendors(gvl_flag_key))
+            self._gvl_indexes[('flag_mask', gvl_flag_key)] = flag_mask
+        return flag_mask
+
+    def _get_consented_mask(self):
+        """
+        Internal helper returning the consented vendor IDs as a numpy bool array
+        over the GVL vendor ID space, built on first use and memoized.
+
+        Returns:
+            numpy.ndarray: Bool array over vendor IDs, True where consent is granted.
+        """
+        if self._consented_mask is None:
+            self._consented_mask = self._vendor_ids_to_mask(self._consented_ids_sorted)
+        return self._consented_mask
+
+    def _get_consented_id_array(self):
+        """
+        Internal helper returning the sorted consented vendor IDs as a contiguous
+        int32 array, built on first use and memoized.
+
+        Returns:
+            numpy.ndarray | array.array: A read-only numpy int32 array if numpy is
+                                         installed, otherwise an array.array('i').
+        """
+        if self._consented_id_array is None:
+            consented_vendor_ids = self._consented_ids_sorted
+            if np is not None:
+                id_array = np.array(consented_vendor_ids, dtype=np.int32)
+                id_array.flags.writeable = False # Shared by every caller
+            else:
+                id_array = array.array('i', consented_vendor_ids)
+            self._consented_id_array = id_array
+        return self._consented_id_array
 
     def _get_vendor_details(self, vendor_id: int) -> dict:
         """
@@ -187,35 +1192,19 @@ class TCFProcessor:
         Returns:
             dict: A dictionary containing formatted vendor details based on GVL data,
                   with defaults for missing fields or if the vendor/GVL is not found.
+                  The dict and its ID lists are fresh copies the caller may mutate.
         """
-        vendor_gvl_data = self._get_vendor_gvl_data(vendor_id)
-        is_gvl_loaded = bool(self.gvl_vendors_dict) # Check if GVL dictionary has content
+        prebuilt = self._gvl_vendor_details.get(vendor_id)
+        if prebuilt is not None:
+            # Copy, since the prebuilt details are shared between instances
+            return _copy_vendor_details(prebuilt)
 
-        # Determine name based on availability
-        if not is_gvl_loaded:
+        # Vendor not available: return the defaults, with a name explaining why
+        if not self._gvl_vendors: # Check if GVL dictionary has content
             name = 'unknown (GVL not loaded)'
-        elif not vendor_gvl_data:
-            name = 'unknown (Not in GVL)'
         else:
-            name = vendor_gvl_data.get('name', 'unknown')
-
-        # Return structure based on user's requested format
-        return {
-            'id': vendor_gvl_data.get('id', vendor_id), # Prefer GVL ID, fallback to input ID
-            'name': name,
-            'purposes': vendor_gvl_data.get('purposes', []),
-            'legIntPurposes': vendor_gvl_data.get('legIntPurposes', []),
-            'flexiblePurposes': vendor_gvl_data.get('flexiblePurposes', []),
-            'specialPurposes': vendor_gvl_data.get('specialPurposes', []),
-            'features': vendor_gvl_data.get('features', []),
-            'specialFeatures': vendor_gvl_data.get('specialFeatures', []),
-            'policyUrl': vendor_gvl_data.get('policyUrl', ''),
-            'cookieMaxAgeSeconds': vendor_gvl_data.get('cookieMaxAgeSeconds', None),
-            'usesCookies': vendor_gvl_data.get('usesCookies', False),
-            'cookieRefresh': vendor_gvl_data.get('cookieRefresh', False),
-            'usesNonCookieAccess': vendor_gvl_data.get('usesNonCookieAccess', False),
-            'deviceStorageDisclosureUrl': vendor_gvl_data.get('deviceStorageDisclosureUrl', '')
-        }
+            name = 'unknown (Not in GVL)'
+        return _build_vendor_details(vendor_id, {'name': name})
 
     # --- Public Methods ---
 
@@ -226,63 +1215,28 @@ class TCFProcessor:
         Attempts to return metadata even if non-critical initialization errors occurred
         (e.g., file loading warnings). Includes an 'error' or 'initialization_error' key
         if applicable. Handles bytes and datetime objects for JSON serialization.
+        The metadata is converted once; each call returns a copy. If the string
+        hasn't been fully decoded yet, only the core segment header is parsed.
 
         Returns:
             dict: A dictionary containing TCF metadata (version, timestamps, CMP info, etc.).
                   Returns {'error': message} if decoding failed critically.
         """
-        if not self.consent_object:
+        source = self._get_header_source()
+        if not source:
             msg = "Cannot get metadata, consent object not available (decoding may have failed)."
-            print(f"Warning: {msg}")
+            self._log.warning(msg)
             # Return error state if it exists, otherwise the generic message
-            return {'error': self.error_state or msg}
-        if self.error_state:
-             print(f"Warning: Returning metadata, but a critical initialization error occurred: {self.error_state}")
+            return {'error': self._error_state or msg}
+        if self._error_state:
+             self._log.warning("Returning metadata, but a critical initialization error occurred: %s", self._error_state)
              # Proceed to get what metadata we can, but include error info
 
-        # Helper to safely get attributes, format dates, and decode bytes
-        def _safe_get(attr_name):
-            val = getattr(self.consent_object, attr_name, None)
-            if isinstance(val, datetime):
-                try:
-                    # Use UTC timezone and ISO format
-                    return val.astimezone(timezone.utc).isoformat()
-                except (ValueError, OSError):
-                    # Fallback for problematic timestamps (e.g., out of range)
-                    return str(val)
-            elif isinstance(val, bytes):
-                try:
-                    # Decode bytes using UTF-8, replace invalid chars
-                    return val.decode('utf-8', errors='replace')
-                except Exception as decode_err:
-                     # Fallback if decoding fails
-                    print(f"Warning: Could not decode bytes for attribute '{attr_name}': {decode_err}")
-                    return f"<bytes: {len(val)} bytes>"
-            # Return other types (int, bool, str, None) as is
-            return val
+        if self._metadata_cache is None:
+            self._metadata_cache = self._build_metadata(source)
 
-        metadata = {
-            'tcf_version': _safe_get('version'),
-            'created': _safe_get('created'),
-            'last_updated': _safe_get('last_updated'),
-            'cmp_id': _safe_get('cmp_id'),
-            'cmp_version': _safe_get('cmp_version'),
-            'consent_screen': _safe_get('consent_screen'),
-            'vendor_list_version': _safe_get('vendor_list_version'),
-            'tcf_policy_version': _safe_get('tcf_policy_version'),
-            'consent_language': _safe_get('consent_language'),
-            'publisher_cc': _safe_get('publisher_cc'),
-            'is_service_specific': _safe_get('is_service_specific'),
-            'purpose_one_treatment': _safe_get('purpose_one_treatment'),
-            'use_non_standard_stacks': _safe_get('use_non_standard_stacks')
-            # Add other relevant fields from self.consent_object if needed
-        }
-
-        # Include initialization error in metadata if one occurred
-        if self.error_state:
-            metadata['initialization_error'] = self.error_state
-
-        return metadata
+        # Return a copy so callers (e.g. prepare_data_for_storage) can extend it
+        return dict(self._metadata_cache)
 
     def get_consented_vendors(self, include_details: bool = True) -> list:
         """
@@ -293,38 +1247,64 @@ class TCFProcessor:
             include_details (bool): If True (default), returns a list of dictionaries
                                     with full vendor details formatted via GVL lookup.
                                     If False, returns only a list of integer vendor IDs.
+                                    It stays a plain list that callers may mutate and
+                                    pass to json.dumps (which rejects array.array);
+                                    use get_consented_vendor_id_array() instead for
+                                    the IDs as a compact contiguous array.
 
         Returns:
             list: A list of consented vendor IDs (int) or a list of vendor detail
                   dictionaries. Returns an empty list if decoding failed, no consent
                   object is available, or no vendors have consent.
         """
-        if not self.consent_object or self.error_state:
-            print("Warning: Cannot get consented vendors, consent object not available or init error.")
+        if not self._is_ready():
+            if self._error_state:
+                self._log.warning("Cannot get consented vendors, consent object not available or init error.")
+            else:
+                self._log.warning("Decoded consent object missing 'consented_vendors' attribute.")
             return []
-        # Check specifically for the attribute holding consent status
-        if not hasattr(self.consent_object, 'consented_vendors'):
-             print("Warning: Decoded consent object missing 'consented_vendors' attribute.")
-             return []
-
-        vendor_consents_dict = self.consent_object.consented_vendors
-        # Filter for vendors where the value is True (consent granted)
-        consented_vendor_ids = [
-            vendor_id for vendor_id, consented in vendor_consents_dict.items() if consented
-        ]
+
+        # Vendors with consent granted were collected and sorted once after decoding
+        consented_vendor_ids = self._consented_ids_sorted
 
         if not consented_vendor_ids:
-            print("No vendors found with consent in the TCF string.")
+            self._log.debug("No vendors found with consent in the TCF string.")
             return []
 
         if not include_details:
-            # Return just the list of integer IDs
-            return consented_vendor_ids
+            # Return just the list of integer IDs (a fresh list the caller may mutate)
+            return list(consented_vendor_ids)
         else:
             # Return list of detailed dictionaries
-            print(f"Building details for {len(consented_vendor_ids)} consented vendors...")
-            details_list = [self._get_vendor_details(vid) for vid in consented_vendor_ids]
-            return details_list
+            self._log.debug("Building details for %d consented vendors...", len(consented_vendor_ids))
+            # Copy the prebuilt details directly with locally bound lookups; only
+            # vendors missing from the GVL go through _get_vendor_details
+            get_prebuilt = self._gvl_vendor_details.get
+            get_details = self._get_vendor_details
+            return [
+                _copy_vendor_details(prebuilt) if (prebuilt := get_prebuilt(vendor_id)) is not None
+                else get_details(vendor_id)
+                for vendor_id in consented_vendor_ids
+            ]
+
+    def get_consented_vendor_id_array(self):
+        """
+        Gets the vendor IDs with consent as a sorted, contiguous int32 array, for
+        consumers doing vectorized matching (e.g. numpy.isin or numpy.intersect1d)
+        rather than iterating a list of Python ints.
+
+        Returns:
+            numpy.ndarray | array.array: A read-only numpy int32 array if numpy is
+                  installed, otherwise a copy as array.array('i'). Empty if decoding
+                  failed or no vendors have consent.
+        """
+        if not self.consent_object or self.error_state:
+            self._log.warning("Cannot get consented vendors, consent object not available or init error.")
+            return np.zeros(0, dtype=np.int32) if np is not None else array.array('i')
+
+        id_array = self._get_consented_id_array()
+        # numpy arrays are returned read-only; array.array can't be, so copy it
+        return id_array if np is not None else array.array('i', id_array)
 
     def get_cmp_details(self) -> dict:
         """
@@ -336,46 +1316,53 @@ class TCFProcessor:
                   cmp-list.json file structure (if found). Includes an 'error' key
                   if the CMP ID is missing, the CMP list wasn't loaded, or the ID
                   was not found in the list. Returns {'id': id, 'name': 'unknown...'}
-                  as a fallback structure on lookup failure.
+                  as a fallback structure on lookup failure. The lookup runs on the
+                  first call and a copy of its result is returned afterwards. If the
+                  string hasn't been fully decoded yet, only its header is parsed.
         """
-        if not self.consent_object:
+        source = self._get_header_source()
+        if not source:
             msg = "Cannot get CMP details, consent object not available."
-            print(f"Warning: {msg}")
-            return {'error': self.error_state or msg}
-        if self.error_state:
-             print(f"Warning: Attempting CMP details lookup, but init error occurred: {self.error_state}")
+            self._log.warning(msg)
+            return {'error': self._error_state or msg}
+        if self._error_state:
+             self._log.warning("Attempting CMP details lookup, but init error occurred: %s", self._error_state)
 
-        if not hasattr(self.consent_object, 'cmp_id'):
+        if not hasattr(source, 'cmp_id'):
             msg = "Consent object missing 'cmp_id' attribute."
-            print(f"Warning: {msg}")
+            self._log.warning(msg)
             return {'error': msg}
 
-        cmp_id = getattr(self.consent_object, 'cmp_id', None) # Use getattr for safety
+        cmp_id = getattr(source, 'cmp_id', None) # Use getattr for safety
         if not cmp_id:
              # TCF spec allows CMP ID 0 or null, treat as "not set" for lookup purposes
-             print("Warning: CMP ID is not set (0 or None) in the TCF string.")
+             self._log.warning("CMP ID is not set (0 or None) in the TCF string.")
              return {'id': cmp_id, 'name': 'unknown (CMP ID not set)'}
 
         # Check if CMP list was loaded
-        if not self.cmp_list_dict:
+        if not self._cmps:
             msg = "Cannot get CMP details, CMP list failed to load or is empty."
-            print(f"Warning: {msg}")
+            self._log.warning(msg)
             return {'id': cmp_id, 'name': 'unknown (CMP list not loaded)', 'error': msg}
 
-        print(f"\nAttempting to find details for CMP ID: {cmp_id} in loaded CMP list...")
-        cmp_id_str = str(cmp_id)
-        # Retrieve the dictionary of CMP details from the loaded list
-        cmp_details = self.cmp_list_dict.get(cmp_id_str)
+        if self._cmp_details_cache is None:
+            self._log.debug("Attempting to find details for CMP ID: %s in loaded CMP list...", cmp_id)
+            # Retrieve the dictionary of CMP details from the loaded list (int keys)
+            cmp_details = self._cmps.get(cmp_id)
 
-        if cmp_details:
-            print(f"  - Found details for CMP ID {cmp_id} in CMP list.")
-            # Return the dictionary exactly as found in the CMP list file
-            return cmp_details
-        else:
-            msg = f"CMP ID {cmp_id} not found in the loaded CMP list data."
-            print(f"  - {msg}")
-            # Return a consistent structure indicating lookup failure
-            return {'id': cmp_id, 'name': 'unknown (Not found in CMP list)', 'error': msg}
+            if cmp_details:
+                self._log.debug("Found details for CMP ID %s in CMP list.", cmp_id)
+                self._cmp_details_cache = cmp_details
+            else:
+                msg = f"CMP ID {cmp_id} not found in the loaded CMP list data."
+                self._log.debug(msg)
+                # Return a consistent structure indicating lookup failure
+                self._cmp_details_cache = {'id': cmp_id, 'name': 'unknown (Not found in CMP list)', 'error': msg}
+
+        # Return a deep copy of the dictionary as found in the CMP list file: the
+        # loaded list (including nested values such as 'environments') is shared
+        # between instances
+        return copy.deepcopy(self._cmp_details_cache)
 
     # --- Legitimate Interest Methods ---
 
@@ -395,7 +1382,7 @@ class TCFProcessor:
                 or no vendors have LI established.
         """
         if not self.consent_object or self.error_state:
-            print("Warning: Cannot get LI vendors, consent object not available or init error.")
+            self._log.warning("Cannot get LI vendors, consent object not available or init error.")
             return {}
 
         # --- MODIFICATION START ---
@@ -403,56 +1390,51 @@ class TCFProcessor:
         if not hasattr(self.consent_object, 'is_interest_allowed'):
             # If even the method isn't there, something is fundamentally wrong or
             # we need to parse interests_vendors_range manually
-            print("ERROR: Decoded object missing expected 'is_interest_allowed' method.")
-            print("       Cannot determine LI vendors. Check iab-tcf library version/documentation.")
+            self._log.error("Decoded object missing expected 'is_interest_allowed' method. "
+                         "Cannot determine LI vendors. Check iab-tcf library version/documentation.")
             return {}
 
         result = {}
         # Determine the range of vendor IDs to check.
         # We can check all vendors in the GVL, or up to max_interests_vendor_id if available.
         # Using GVL keys is safer if GVL is loaded.
-        vendors_to_check = []
-        if self.gvl_vendors_dict:
-            try:
-                # Convert GVL string keys back to int for checking
-                vendors_to_check = [int(vid) for vid in self.gvl_vendors_dict.keys()]
-            except ValueError:
-                print("Warning: Could not parse vendor IDs from GVL keys.")
-                # Fallback needed? Or maybe check up to max_interests_vendor_id?
-                # max_id = getattr(self.consent_object, 'max_interests_vendor_id', 0)
-                # vendors_to_check = range(1, max_id + 1) # Less ideal as relies on another attr
+        # GVL keys are already integer vendor IDs (converted on load)
+        vendors_to_check = self._gvl_vendors
 
         if not vendors_to_check:
-            print("Warning: No vendor IDs available to check for LI.")
+            self._log.warning("No vendor IDs available to check for LI.")
             return {}
 
 
-        print(f"Checking {len(vendors_to_check)} potential LI vendors using 'is_interest_allowed'...")
-        for vendor_id in vendors_to_check:
+        self._log.debug("Checking %d potential LI vendors using 'is_interest_allowed'...", len(vendors_to_check))
+        # Resolve the LI check once rather than per vendor: a set lookup if the LI
+        # bitfield was already scanned after decoding, else the object's method
+        li_ids = self._li_ids
+        is_li_established = li_ids.__contains__ if li_ids is not None else self.consent_object.is_interest_allowed
+        for vendor_id, vendor_gvl_data in vendors_to_check.items():
             try:
-                # Call the method to check LI status for this vendor ID
-                li_established = self.consent_object.is_interest_allowed(vendor_id)
-
-                if li_established:
-                    vendor_gvl_data = self._get_vendor_gvl_data(vendor_id)
-                    declared_li_purposes = vendor_gvl_data.get('legIntPurposes', [])
+                if is_li_established(vendor_id):
+                    # Null entries in the GVL are treated like missing vendors
+                    vendor_gvl_data = vendor_gvl_data or {}
+                    # Copied: the GVL's list is shared by every instance
+                    declared_li_purposes = _copy_if_list(vendor_gvl_data.get('legIntPurposes', []))
                     result[vendor_id] = {
                         'name': vendor_gvl_data.get('name', 'unknown (check GVL)'), # Added note
                         'declared_li_purposes': declared_li_purposes
                     }
             except Exception as e:
                 # Catch potential errors during the check for a specific vendor
-                print(f"Warning: Error checking LI for vendor {vendor_id}: {e}")
+                self._log.warning("Error checking LI for vendor %s: %s", vendor_id, e)
                 continue # Skip to the next vendor
 
         # --- MODIFICATION END ---
 
-        print(f"Found {len(result)} vendors with Legitimate Interest established by user.")
+        self._log.debug("Found %d vendors with Legitimate Interest established by user.", len(result))
         return result
 
     # --- Vendor Filtering Methods (Consent + GVL Declaration) ---
 
-    def _get_consented_vendors_matching_gvl_list(self, gvl_list_key: str, required_ids: list[int], require_all: bool = False) -> dict:
+    def _get_consented_vendors_matching_gvl_list(self, gvl_list_key: str, required_ids: frozenset[int], require_all: bool = False) -> dict:
         """
         Internal helper: Finds vendors who have consent (via TCF string) AND
         declare specific IDs in a given list within their GVL entry.
@@ -460,8 +1442,8 @@ class TCFProcessor:
         Args:
             gvl_list_key (str): The key for the list attribute in the vendor's GVL data
                                 (e.g., 'purposes', 'specialFeatures', 'legIntPurposes').
-            required_ids (list[int]): A list of IDs (e.g., purpose IDs, feature IDs)
-                                      to check for in the vendor's GVL list.
+            required_ids (frozenset[int]): The IDs (e.g., purpose IDs, feature IDs)
+                                           to check for in the vendor's GVL list.
             require_all (bool): If True, the vendor must declare ALL IDs in `required_ids`
                                 within their GVL list. If False (default), the vendor
                                 must declare AT LEAST ONE ID from `required_ids`.
@@ -471,55 +1453,105 @@ class TCFProcessor:
                   `{ vendor_id: {'name': str, 'matched_ids': list[int]} }`
                   The 'matched_ids' list contains the subset of `required_ids` that
                   were actually found in the vendor's GVL declaration. Returns an
-                  empty dictionary on error or if no vendors match.
+                  empty dictionary on error or if no vendors match. Matches are
+                  cached per query as immutable tuples; each call returns freshly
+                  built dicts and lists the caller may mutate.
         """
-        if not self.consent_object or self.error_state:
-            print(f"Warning: Cannot check vendors for GVL key '{gvl_list_key}', consent object unavailable or init error.")
+        if not self._is_ready():
+            if self._error_state:
+                self._log.warning("Cannot check vendors for GVL key '%s', consent object unavailable or init error.", gvl_list_key)
+            else:
+                self._log.warning("Decoded object missing 'consented_vendors' attribute.")
             return {}
-        if not hasattr(self.consent_object, 'consented_vendors'):
-             print("Warning: Decoded object missing 'consented_vendors' attribute.")
-             return {}
 
-        consented_vendors_map = self.consent_object.consented_vendors
-        matching_vendors = {}
-        required_id_set = set(required_ids) # Use a set for efficient lookup
+        matches = () # (vendor ID, name, matched IDs) per matching vendor
+        required_id_set = required_ids # Already a frozenset, built by the public wrappers
 
         if not required_id_set:
-            print(f"Warning: No IDs provided to check for GVL key '{gvl_list_key}'.")
+            self._log.warning("No IDs provided to check for GVL key '%s'.", gvl_list_key)
+            return {}
+        if not self._consented_ids:
+            # Common rejection case: nothing can match, so skip the indexes and masks
             return {}
 
-        print(f"Checking consented vendors against GVL key '{gvl_list_key}' for IDs: {required_ids} (require_all={require_all})")
-        # Iterate only through vendors who have consent
-        for vendor_id, consented in consented_vendors_map.items():
-            if consented:
-                vendor_gvl_data = self._get_vendor_gvl_data(vendor_id)
-                # Get the list of IDs declared by the vendor in GVL for the specific key
-                declared_ids_list = vendor_gvl_data.get(gvl_list_key, [])
-                declared_ids_set = set(declared_ids_list)
-
-                # Find which of the required IDs are actually declared by this vendor
-                intersection_ids = declared_ids_set.intersection(required_id_set)
-
-                # Check if the requirement (all or at least one) is met
-                passes_requirement = False
-                if intersection_ids: # If there's any overlap
-                    if require_all:
-                        # Does the intersection contain all the required IDs?
-                        if intersection_ids == required_id_set:
-                             passes_requirement = True
-                    else:
-                        # If require_all is False, any intersection means success
-                        passes_requirement = True
-
-                if passes_requirement:
-                    matching_vendors[vendor_id] = {
-                        'name': vendor_gvl_data.get('name', 'unknown'),
-                        # Store the specific required IDs that were matched
-                        'matched_ids': sorted(list(intersection_ids))
-                    }
-
-        print(f"Found {len(matching_vendors)} consented vendors matching criteria for '{gvl_list_key}'.")
-        return matching_vendors
+        # Repeat queries (e.g. fixed purpose IDs) are answered from the per-instance cache
+        cache_key = (gvl_list_key, required_id_set, bool(require_all))
+        query_cache = self._query_cache
+        if query_cache is None:
+            query_cache = self._query_cache = {}
+        cached = query_cache.get(cache_key)
+        if cached is not None:
+            return _expand_gvl_list_matches(cached)
+
+        # Hot path: skip building log arguments unless debug logging is enabled
+        debug_enabled = self._log.isEnabledFor(logging.DEBUG)
+        if debug_enabled:
+            self._log.debug("Checking consented vendors against GVL key '%s' for IDs: %s (require_all=%s)",
+                         gvl_list_key, list(required_id_set), require_all)
+        # Combine the vendors declaring each required ID (all: intersection, at
+        # least one: union) and keep those with consent: vectorized over vendor
+        # ID masks with numpy, otherwise as C-level frozenset operations
+        if np is not None:
+            masks_by_id = self._get_gvl_vendor_masks(gvl_list_key)
+            declaring_masks = [masks_by_id.get(required_id) for required_id in required_id_set]
+            if require_all and any(mask is None for mask in declaring_masks):
+                candidate_ids = [] # Some required ID is declared by no vendor
+            else:
+                declaring_masks = [mask for mask in declaring_masks if mask is not None]
+                if declaring_masks:
+                    combine = np.logical_and if require_all else np.logical_or
+                    matched_mask = combine.reduce(declaring_masks) & self._get_consented_mask()
+                    candidate_ids = np.flatnonzero(matched_mask).tolist() # Ascending
+                else:
+                    candidate_ids = []
+        else:
+            vendors_by_id = self._get_gvl_inverted_index(gvl_list_key)
+            declaring_sets = [vendors_by_id.get(required_id, _EMPTY_IDS) for required_id in required_id_set]
+            if require_all:
+                # Intersect from the rarest declaration up, so each step scans the
+                # smallest set so far, stopping as soon as nothing is left
+                declaring_sets.sort(key=len)
+                candidate_ids = declaring_sets[0]
+                for declaring_set in declaring_sets[1:]:
+                    if not candidate_ids:
+                        break
+                    candidate_ids = candidate_ids & declaring_set
+                candidate_ids = candidate_ids & self._consented_ids
+            else:
+                candidate_ids = self._consented_ids.intersection(_EMPTY_IDS.union(*declaring_sets))
+            candidate_ids = sorted(candidate_ids)
+
+        if candidate_ids:
+            # With require_all or a single required ID, every candidate matched all of them
+            if require_all or len(required_id_set) == 1:
+                all_matched_ids = sorted(required_id_set)
+                declared_masks = None
+            else:
+                declared_masks = self._get_gvl_declared_masks(gvl_list_key)
+                # Only non-negative ints can be declared, so only those can match
+                required_bits = sorted(
+                    required_id for required_id in required_id_set
+                    if isinstance(required_id, int) and required_id >= 0
+                )
+            # Candidates all come from the GVL indexes, so each has a name entry
+            names = self._get_gvl_vendor_names()
+            if declared_masks is None:
+                all_matched_ids = tuple(all_matched_ids)
+                matches = tuple(
+                    (vendor_id, names[vendor_id], all_matched_ids) for vendor_id in candidate_ids
+                )
+            else:
+                # Store the specific required IDs that were matched
+                matches = tuple(
+                    (vendor_id, names[vendor_id],
+                     tuple(bit for bit in required_bits if declared_masks[vendor_id] >> bit & 1))
+                    for vendor_id in candidate_ids
+                )
+
+        if debug_enabled:
+            self._log.debug("Found %d consented vendors matching criteria for '%s'.", len(matches), gvl_list_key)
+        query_cache[cache_key] = matches
+        return _expand_gvl_list_matches(matches)
 
     def get_consented_vendors_for_purposes(self, purpose_ids: list[int], require_all: bool = False) -> dict:
         """
@@ -537,7 +1569,7 @@ class TCFProcessor:
         Returns:
             dict: `{ vendor_id: {'name': str, 'matched_ids': list[int]} }`
         """
-        return self._get_consented_vendors_matching_gvl_list('purposes', purpose_ids, require_all)
+        return self._get_consented_vendors_matching_gvl_list('purposes', frozenset(purpose_ids), require_all)
 
     def get_consented_vendors_for_special_purposes(self, purpose_ids: list[int], require_all: bool = False) -> dict:
         """
@@ -551,7 +1583,7 @@ class TCFProcessor:
         Returns:
             dict: `{ vendor_id: {'name': str, 'matched_ids': list[int]} }`
         """
-        return self._get_consented_vendors_matching_gvl_list('specialPurposes', purpose_ids, require_all)
+        return self._get_consented_vendors_matching_gvl_list('specialPurposes', frozenset(purpose_ids), require_all)
 
     def get_consented_vendors_for_features(self, feature_ids: list[int], require_all: bool = False) -> dict:
         """
@@ -565,7 +1597,7 @@ class TCFProcessor:
         Returns:
             dict: `{ vendor_id: {'name': str, 'matched_ids': list[int]} }`
         """
-        return self._get_consented_vendors_matching_gvl_list('features', feature_ids, require_all)
+        return self._get_consented_vendors_matching_gvl_list('features', frozenset(feature_ids), require_all)
 
     def get_consented_vendors_for_special_features(self, feature_ids: list[int], require_all: bool = False) -> dict:
         """
@@ -582,7 +1614,7 @@ class TCFProcessor:
         Returns:
             dict: `{ vendor_id: {'name': str, 'matched_ids': list[int]} }`
         """
-        return self._get_consented_vendors_matching_gvl_list('specialFeatures', feature_ids, require_all)
+        return self._get_consented_vendors_matching_gvl_list('specialFeatures', frozenset(feature_ids), require_all)
 
     def get_consented_vendors_for_flexible_purposes(self, purpose_ids: list[int], require_all: bool = False) -> dict:
         """
@@ -600,7 +1632,7 @@ class TCFProcessor:
         Returns:
             dict: `{ vendor_id: {'name': str, 'matched_ids': list[int]} }`
         """
-        return self._get_consented_vendors_matching_gvl_list('flexiblePurposes', purpose_ids, require_all)
+        return self._get_consented_vendors_matching_gvl_list('flexiblePurposes', frozenset(purpose_ids), require_all)
 
     # --- Vendor Property Lookup ---
 
@@ -610,14 +1642,38 @@ class TCFProcessor:
         directly from the loaded GVL data.
 
         Args:
-            vendor_id (int): The integer ID of the vendor.
+            vendor_id (int): The integer ID of the vendor. A numeric string such as
+                             '755' is accepted too.
 
         Returns:
             dict: Contains 'policyUrl' (str), 'deviceStorageDisclosureUrl' (str).
                   Includes an 'error' key (str) if the GVL wasn't loaded or the vendor
                   ID was not found. URLs default to empty strings on failure.
+                  Results are cached per vendor ID; a copy is returned.
+        """
+        int_key = _as_int_key(vendor_id)
+        # Anything that isn't an ID can't be in the GVL; its string form still
+        # names it in the error and is always hashable
+        vendor_id = int_key if int_key is not None else str(vendor_id)
+        urls_cache = self._vendor_urls_cache
+        if urls_cache is None:
+            urls_cache = self._vendor_urls_cache = {}
+        cached = urls_cache.get(vendor_id)
+        if cached is None:
+            cached = urls_cache[vendor_id] = self._compute_vendor_urls(vendor_id)
+        return dict(cached)
+
+    def _compute_vendor_urls(self, vendor_id: int) -> dict:
         """
-        if not self.gvl_vendors_dict:
+        Internal helper building the get_vendor_urls() result for a vendor ID.
+
+        Args:
+            vendor_id (int): The integer ID of the vendor.
+
+        Returns:
+            dict: The URLs, or empty URLs with an 'error' key on failure.
+        """
+        if not self._gvl_vendors:
              return {'policyUrl': '', 'deviceStorageDisclosureUrl': '', 'error': 'GVL not loaded or empty'}
 
         vendor_gvl_data = self._get_vendor_gvl_data(vendor_id)
@@ -647,26 +1703,29 @@ class TCFProcessor:
             dict: A dictionary mapping matching vendor IDs (int) to their names (str).
                   Returns an empty dictionary on error or if no vendors match.
         """
-        if not self.consent_object or self.error_state:
-            print(f"Warning: Cannot check vendors for GVL flag '{gvl_flag_key}', consent object unavailable or init error.")
+        if not self._is_ready():
+            if self._error_state:
+                self._log.warning("Cannot check vendors for GVL flag '%s', consent object unavailable or init error.", gvl_flag_key)
+            else:
+                self._log.warning("Decoded object missing 'consented_vendors' attribute.")
             return {}
-        if not hasattr(self.consent_object, 'consented_vendors'):
-             print("Warning: Decoded object missing 'consented_vendors' attribute.")
-             return {}
-
-        consented_vendors_map = self.consent_object.consented_vendors
-        matching_vendors = {}
-
-        print(f"Checking consented vendors for GVL flag '{gvl_flag_key}=true'...")
-        # Iterate only through vendors who have consent
-        for vendor_id, consented in consented_vendors_map.items():
-            if consented:
-                vendor_gvl_data = self._get_vendor_gvl_data(vendor_id)
-                # Check if the flag exists and is True
-                if vendor_gvl_data.get(gvl_flag_key, False): # Default to False if key missing
-                    matching_vendors[vendor_id] = vendor_gvl_data.get('name', 'unknown')
-
-        print(f"Found {len(matching_vendors)} consented vendors matching criteria for flag '{gvl_flag_key}'.")
+        if not self._consented_ids:
+            return {} # No vendor has consent, so none can match
+
+        # Hot path: skip building log arguments unless debug logging is enabled
+        debug_enabled = self._log.isEnabledFor(logging.DEBUG)
+        if debug_enabled:
+            self._log.debug("Checking consented vendors for GVL flag '%s=true'...", gvl_flag_key)
+        # Vendors with consent and the flag set to true, as one mask or set intersection
+        if np is not None:
+            flagged_ids = np.flatnonzero(self._get_consented_mask() & self._get_gvl_flag_mask(gvl_flag_key)).tolist()
+        else:
+            flagged_ids = sorted(self._consented_ids & self._get_gvl_flag_vendors(gvl_flag_key))
+        names = self._get_gvl_vendor_names()
+        matching_vendors = {vendor_id: names[vendor_id] for vendor_id in flagged_ids}
+
+        if debug_enabled:
+            self._log.debug("Found %d consented vendors matching criteria for flag '%s'.", len(matching_vendors), gvl_flag_key)
         return matching_vendors
 
     def get_consented_vendors_using_cookies(self) -> dict:
@@ -687,6 +1746,47 @@ class TCFProcessor:
         """
         return self._get_consented_vendors_by_gvl_flag('usesNonCookieAccess')
 
+    # --- Batched Filtering ---
+
+    def batch_filters(self, specs: dict) -> dict:
+        """
+        Runs several vendor filters in one call. The consent string is decoded and
+        the consented vendor set, GVL indexes and masks are built once and shared
+        by every filter, instead of each caller going through the checks separately.
+
+        Args:
+            specs (dict): Maps a result name of your choice to a filter spec dict:
+                          - `{'type': 'purposes', 'ids': [3, 4], 'require_all': True}`,
+                            where type is one of 'purposes', 'special_purposes',
+                            'features', 'special_features' or 'flexible_purposes'
+                            ('require_all' defaults to False), as in the matching
+                            get_consented_vendors_for_<type> method.
+                          - `{'type': 'flag', 'flag': 'usesCookies'}` for a boolean GVL
+                            flag such as 'usesCookies' or 'usesNonCookieAccess'.
+
+        Returns:
+            dict: Maps each result name to the filter's result, in the same format
+                  as the corresponding single-filter method. Specs with an unknown
+                  type give an empty dictionary. All results are empty if decoding failed.
+        """
+        if not self._is_ready():
+            self._log.warning("Cannot run batch filters, consent object not available, init error, or no vendor consents.")
+            return {name: {} for name in specs}
+
+        results = {}
+        for name, spec in specs.items():
+            spec_type = spec.get('type')
+            gvl_list_key = _BATCH_FILTER_LIST_KEYS.get(spec_type)
+            if gvl_list_key is not None:
+                results[name] = self._get_consented_vendors_matching_gvl_list(
+                    gvl_list_key, frozenset(spec.get('ids', ())), spec.get('require_all', False))
+            elif spec_type == 'flag':
+                results[name] = self._get_consented_vendors_by_gvl_flag(spec.get('flag'))
+            else:
+                self._log.warning("Unknown batch filter type %r for '%s'.", spec_type, name)
+                results[name] = {}
+        return results
+
     def prepare_data_for_storage(self) -> dict | None:
         """
         Prepares processed TCF data into a structured dictionary for storage (e.g., MongoDB).
@@ -698,13 +1798,13 @@ class TCFProcessor:
         """
         # Basic validation: Ensure decoding was successful
         if self.error_state or not self.consent_object:
-            print("Error: Cannot prepare data. Decoding failed or consent object not available.")
+            self._log.error("Cannot prepare data. Decoding failed or consent object not available.")
             return None
 
-        print("\n--- Preparing Data for Storage ---")
+        self._log.debug("--- Preparing Data for Storage ---")
 
         # --- 1. Gather Core Data Components ---
-        print("Gathering core data components...")
+        self._log.debug("Gathering core data components...")
         # Call internal methods using self
         metadata = self.get_metadata()
         consented_vendor_details = self.get_consented_vendors(include_details=True)
@@ -720,7 +1820,7 @@ class TCFProcessor:
 
 
         # --- 2. Calculate Counts and Augment Metadata ---
-        print("Calculating statistics...")
+        self._log.debug("Calculating statistics...")
         consented_vendor_count = len(consented_vendor_details)
         li_established_vendor_count = len(li_vendor_dict) # User established LI
 
@@ -770,14 +1870,14 @@ class TCFProcessor:
         # metadata['tcf_string'] = self.consent_string
 
         # --- 3. Format Legitimate Interest Vendor List ---
-        print("Formatting LI vendor list...")
+        self._log.debug("Formatting LI vendor list...")
         # Create a list of LI vendor details including the ID
         legitimate_interest_vendors_list = [
             {'id': vid, **details} for vid, details in li_vendor_dict.items()
         ]
 
         # --- 4. Construct Final Payload ---
-        print("Assembling final payload...")
+        self._log.debug("Assembling final payload...")
         storage_payload = {
             'metadata': metadata,
             'consented_vendors': consented_vendor_details, # Already a list of dicts
@@ -785,10 +1885,54 @@ class TCFProcessor:
             'cmp_details': cmp_details
         }
 
-        print("Payload preparation finished.")
+        self._log.debug("Payload preparation finished.")
         return storage_payload
 
 
+# --- Batch Processing ---
+
+def process_batch(consent_strings: list,
+                  gvl_filepath: str = 'vendor-list.json',
+                  cmp_list_filepath: str = 'cmp-list.json',
+                  max_workers: int = 1,
+                  index_cache_dir: str | None = None) -> list:
+    """
+    Processes many TCF consent strings and returns one storage payload (see
+    TCFProcessor.prepare_data_for_storage) per string, in input order.
+
+    The GVL and CMP list are loaded once up front and shared read-only by all the
+    processors. By default the strings are processed serially: the per-string work
+    is pure Python that holds the GIL, so on standard builds a thread pool only
+    adds overhead. On free-threaded Python builds, max_workers > 1 processes
+    strings in parallel; each string gets its own TCFProcessor, so no per-instance
+    state is shared between threads.
+
+    Args:
+        consent_strings (list): The TCF consent strings to process.
+        gvl_filepath (str): The path to the GVL JSON file (vendors).
+                            Defaults to 'vendor-list.json'.
+        cmp_list_filepath (str): The path to the CMP List JSON file.
+                                 Defaults to 'cmp-list.json'.
+        max_workers (int): Number of worker threads. Defaults to 1, which runs
+                           serially in the calling thread without a pool.
+        index_cache_dir (str | None): Opt-in directory for persisted parsed data,
+                                      as in TCFProcessor(). Defaults to None.
+
+    Returns:
+        list: The payload dict for each string, or None where decoding failed.
+    """
+    if not consent_strings:
+        return []
+
+    # Load the files once so the workers don't each stat and look them up
+    processors = TCFProcessor.from_consent_strings(
+        consent_strings, gvl_filepath, cmp_list_filepath, index_cache_dir)
+    if max_workers <= 1:
+        return [processor.prepare_data_for_storage() for processor in processors]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(TCFProcessor.prepare_data_for_storage, processors))
+
+
 # --- Example Usage ---
 if __name__ == "__main__":
     print("--- TCF Processor Example ---")
@@ -816,7 +1960,8 @@ if __name__ == "__main__":
     processor = TCFProcessor(
         consent_string=consent_string_to_test,
         gvl_filepath=gvl_file_location,
-        cmp_list_filepath=cmp_list_file_location
+        cmp_list_filepath=cmp_list_file_location,
+        verbose=True # Show the processor's progress messages alongside the example output
     )
     print("-" * 25)
 
@@ -895,21 +2040,33 @@ if __name__ == "__main__":
     print("-" * 25)
 
 
+    # Run the purpose/feature (7) and cookie (9) filters in one batched call
+    filter_results = processor.batch_filters({
+        # Consented vendors declaring Purpose 1 (Store and/or access information)
+        'purpose_1': {'type': 'purposes', 'ids': [1]},
+        # Consented vendors declaring Special Feature 1 (Use precise geolocation data)
+        'special_feature_1': {'type': 'special_features', 'ids': [1]},
+        # Consented vendors declaring BOTH Purpose 3 AND Purpose 4
+        'purposes_3_and_4': {'type': 'purposes', 'ids': [3, 4], 'require_all': True},
+        'uses_cookies': {'type': 'flag', 'flag': 'usesCookies'},
+        'uses_non_cookie_access': {'type': 'flag', 'flag': 'usesNonCookieAccess'},
+    })
+
     # 7. Get Vendors by Purpose / Feature Consent
     print("\n7. Vendors by Purpose/Feature (Examples)")
     print("-" * 25)
     # Example 1: Consented vendors declaring Purpose 1 (Store and/or access information)
-    purpose_1_vendors = processor.get_consented_vendors_for_purposes([1])
+    purpose_1_vendors = filter_results['purpose_1']
     print(f"Consented Vendors declaring Purpose 1: Count={len(purpose_1_vendors)}")
     # print subset... (omitted for brevity)
 
     # Example 2: Consented vendors declaring Special Feature 1 (Use precise geolocation data)
-    sp_feat_1_vendors = processor.get_consented_vendors_for_special_features([1])
+    sp_feat_1_vendors = filter_results['special_feature_1']
     print(f"Consented Vendors declaring Special Feature 1: Count={len(sp_feat_1_vendors)}")
     # print subset...
 
     # Example 3: Consented vendors declaring BOTH Purpose 3 AND Purpose 4
-    p3_p4_vendors = processor.get_consented_vendors_for_purposes([3, 4], require_all=True)
+    p3_p4_vendors = filter_results['purposes_3_and_4']
     print(f"Consented Vendors declaring BOTH Purposes 3 & 4: Count={len(p3_p4_vendors)}")
     # print subset...
     print("-" * 25)
@@ -927,11 +2084,11 @@ if __name__ == "__main__":
     # 9. Get Vendors by Cookie/Non-Cookie Use
     print("\n9. Vendors by Cookie/Non-Cookie Use")
     print("-" * 25)
-    cookie_vendors = processor.get_consented_vendors_using_cookies()
+    cookie_vendors = filter_results['uses_cookies']
     print(f"Consented Vendors Using Cookies: Count={len(cookie_vendors)}")
     # print subset...
 
-    non_cookie_vendors = processor.get_consented_vendors_using_non_cookie_access()
+    non_cookie_vendors = filter_results['uses_non_cookie_access']
     print(f"Consented Vendors Using Non-Cookie Access: Count={len(non_cookie_vendors)}")
     # print subset...
     print("-" * 25)
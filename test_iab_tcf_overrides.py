@@ -0,0 +1,76 @@
+"""
+Checks that main.py's decoding shortcuts (_decode_v2 and the header-only
+_decode_core_header), which reimplement parts of iab_tcf's private read order,
+still match iab_tcf on the pinned version. Run with:
+
+    python -m unittest test_iab_tcf_overrides
+"""
+import random
+import unittest
+
+import iab_tcf
+
+import main
+
+# The sample TCF v2 string from main.py's example
+SAMPLE_V2 = "CQOKBEAQOKBEAAGABCENBgFgAP_gAEPgAApAJoMB5C5MQSFBIGJ0IJoAaAQFwBgAIAAgAgAAAYABQBIQAIwEQAECAACAAAACAAIAAAAAAABAEABAAAAAAAABAAAAAEAAAAAAAAAAAAAAAgBAAAAAAAAgUAAAAAAQAAQAgAAAQAIAQEgAAAAAAAAAAIAFAAAQAAAAAAAAQAAAAAAAgAgAkABAAAAAAAAAQBAAAAAAAAAAAIAAAAAEEZoFwAAYAFAAWABUAC4AHAAQAAkABUADIAGgAPQAfwBEAEUAJgATgAqgBvAD8AIQARwA5AB3ADxgIOAhABFACLAEiAJSAZwA2gB6gEyAKlAVYAtYBdAC8wGMgMkAZYA2gBuYDgAHLAQTAjMAWEgBgCtAHsA3MKALAAUACoAHoARQB4gEIAPUAugBjIDlgIzDoAYArQB7AP7HgCwAAgAKABUAD0AIoATgB4gHqAXQAxkCMxCASAAsAKoAbwB3AEUAJSAbQBVgD-yUAEAVpMAKAAEAzgC1gGMgOAKQAgBWgP7KgCAAAgAKABUAEUBawC6AGMgRmKAAQAtloAQA7gFWAAAA.f_gAAAAAAAAA"
+
+_BASE64URL = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+
+
+def _sample_strings(prefix):
+    """The sample string's truncations plus seeded random strings starting with prefix."""
+    rng = random.Random(1)
+    strings = [SAMPLE_V2] if prefix == 'C' else []
+    strings += [prefix + SAMPLE_V2[1:i] for i in range(5, len(SAMPLE_V2), 7)]
+    strings += [
+        prefix + ''.join(rng.choice(_BASE64URL) for _ in range(rng.randint(30, 400)))
+        for _ in range(100)
+    ]
+    return strings
+
+
+def _state(value):
+    """Plain comparable form of a decoded value; library objects lack __eq__."""
+    if isinstance(value, dict):
+        return {key: _state(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_state(item) for item in value]
+    if hasattr(value, '__dict__'):
+        return {key: _state(item) for key, item in vars(value).items() if key != '_reader'}
+    return value
+
+
+def _outcome(decoder, consent_string):
+    """The decoded state, or the exception type and message if decoding fails."""
+    try:
+        return _state(decoder(consent_string))
+    except Exception as e:
+        return ('error', type(e), str(e))
+
+
+class DecodeV2EquivalenceTest(unittest.TestCase):
+
+    def test_matches_iab_tcf_decode_v2(self):
+        for consent_string in _sample_strings('C'):
+            with self.subTest(consent_string=consent_string):
+                self.assertEqual(_outcome(main._decode_v2, consent_string),
+                                 _outcome(iab_tcf.decode_v2, consent_string))
+
+
+class CoreHeaderEquivalenceTest(unittest.TestCase):
+
+    def test_matches_iab_tcf_decode(self):
+        for consent_string in _sample_strings('B') + _sample_strings('C'):
+            with self.subTest(consent_string=consent_string):
+                decoded = _outcome(iab_tcf.decode, consent_string)
+                header = _outcome(main._decode_core_header, consent_string)
+                # Both parses fail on the same strings
+                self.assertEqual(isinstance(header, tuple), isinstance(decoded, tuple))
+                if not isinstance(header, tuple):
+                    for field, value in header.items():
+                        self.assertEqual(value, decoded[field], field)
+
+
+if __name__ == '__main__':
+    unittest.main()
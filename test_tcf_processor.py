@@ -0,0 +1,146 @@
+"""
+Behavioural checks for TCFProcessor against the bundled vendor-list.json and
+cmp-list.json. Run with:
+
+    python -m unittest test_tcf_processor
+"""
+import json
+import logging
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import main
+from test_iab_tcf_overrides import SAMPLE_V2
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+GVL_PATH = os.path.join(_HERE, 'vendor-list.json')
+CMP_LIST_PATH = os.path.join(_HERE, 'cmp-list.json')
+
+
+def _processor(consent_string=SAMPLE_V2):
+    return main.TCFProcessor(consent_string, GVL_PATH, CMP_LIST_PATH)
+
+
+class SharedDataIsolationTest(unittest.TestCase):
+    """The data files are parsed once per process; instances must not see each other's changes."""
+
+    def test_raw_data_mutation_does_not_reach_other_instances(self):
+        poisoned = _processor()
+        vendor_id = poisoned.get_consented_vendors(include_details=False)[0]
+        expected_name = _processor().get_consented_vendors()[0]['name']
+        expected_cmp = _processor().get_cmp_details()
+
+        poisoned.gvl_data['vendors'][str(vendor_id)]['name'] = 'POISON'
+        poisoned.gvl_vendors_dict[vendor_id]['name'] = 'POISON'
+        poisoned.gvl_vendors_dict.clear()
+        poisoned.cmp_list_data.clear()
+        poisoned.cmp_list_dict.clear()
+
+        for processor in (poisoned, _processor()):
+            self.assertEqual(processor.get_consented_vendors()[0]['name'], expected_name)
+            self.assertNotIn('POISON', str(processor.get_consented_vendors_using_cookies()))
+            self.assertNotIn('POISON', str(processor.get_consented_vendors_for_purposes([1])))
+            self.assertEqual(processor.get_cmp_details(), expected_cmp)
+        fresh = _processor()
+        self.assertNotEqual(fresh.gvl_data['vendors'][str(vendor_id)]['name'], 'POISON')
+        self.assertTrue(fresh.gvl_vendors_dict)
+        self.assertTrue(fresh.cmp_list_dict)
+
+    def test_returned_results_are_independent(self):
+        first = _processor()
+        details = first.get_consented_vendors()
+        details[0]['purposes'].append(12345)
+        matches = first.get_consented_vendors_for_purposes([1, 2, 3])
+        vendor_id = next(iter(matches))
+        matches[vendor_id]['name'] = 'POISON'
+        matches[vendor_id]['matched_ids'].append(12345)
+        cmp_details = first.get_cmp_details()
+        cmp_details.setdefault('environments', []).append('POISON')
+
+        for processor in (first, _processor()):
+            self.assertNotIn(12345, processor.get_consented_vendors()[0]['purposes'])
+            again = processor.get_consented_vendors_for_purposes([1, 2, 3])
+            self.assertNotEqual(again[vendor_id]['name'], 'POISON')
+            self.assertNotIn(12345, again[vendor_id]['matched_ids'])
+            self.assertNotIn('POISON', processor.get_cmp_details().get('environments', []))
+
+
+class IdKeyCompatibilityTest(unittest.TestCase):
+    """Data file keys and public ID arguments match as they did when compared as strings."""
+
+    def test_cmp_list_with_cmp_dict_at_root(self):
+        with open(CMP_LIST_PATH, 'rb') as f:
+            cmps = json.load(f)['cmps']
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root_path = os.path.join(tmp_dir, 'cmp-list-root.json')
+            with open(root_path, 'w') as f:
+                json.dump({'lastUpdated': '2024-01-01T00:00:00Z', **cmps}, f)
+            processor = main.TCFProcessor(SAMPLE_V2, GVL_PATH, root_path)
+            self.assertEqual(processor.get_cmp_details(), _processor().get_cmp_details())
+
+    def test_get_vendor_urls_accepts_numeric_strings(self):
+        processor = _processor()
+        self.assertEqual(processor.get_vendor_urls('755'), processor.get_vendor_urls(755))
+        self.assertNotIn('error', processor.get_vendor_urls('755'))
+        self.assertIn('error', processor.get_vendor_urls('0755'))
+        self.assertIn('error', processor.get_vendor_urls('not an id'))
+
+
+class VerboseLoggingTest(unittest.TestCase):
+
+    def test_verbose_is_per_instance(self):
+        level = main.logger.level
+        verbose = main.TCFProcessor(SAMPLE_V2, GVL_PATH, CMP_LIST_PATH, verbose=True)
+        quiet = _processor()
+        # The module logger is left alone; only the verbose instance logs at DEBUG
+        self.assertEqual(main.logger.level, level)
+        self.assertTrue(verbose._log.isEnabledFor(logging.DEBUG))
+        self.assertIs(quiet._log, main.logger)
+
+
+# (method suffix, IDs) queries run by FilterPathEquivalenceTest, each with and
+# without require_all
+_LIST_FILTER_QUERIES = (
+    ('purposes', [1]), ('purposes', [2, 7]), ('purposes', [1, 3, 4, 99]),
+    ('special_purposes', [1, 2]), ('features', [1, 2, 3]),
+    ('special_features', [1]), ('special_features', [1, 2]),
+    ('flexible_purposes', [2, 7, 10]), ('purposes', [0, -1, '1']),
+)
+_FLAG_FILTERS = ('using_cookies', 'using_non_cookie_access')
+
+
+def _filter_results():
+    """Results of every filter on a fresh processor, as item lists so order is compared too."""
+    processor = _processor()
+    results = {}
+    for suffix, ids in _LIST_FILTER_QUERIES:
+        method = getattr(processor, 'get_consented_vendors_for_' + suffix)
+        for require_all in (False, True):
+            results[(suffix, tuple(map(str, ids)), require_all)] = list(method(ids, require_all).items())
+    for suffix in _FLAG_FILTERS:
+        results[suffix] = list(getattr(processor, 'get_consented_vendors_' + suffix)().items())
+    results['batch'] = processor.batch_filters({
+        'p': {'type': 'purposes', 'ids': [3, 4], 'require_all': True},
+        'f': {'type': 'flag', 'flag': 'usesNonCookieAccess'},
+    })
+    return results
+
+
+@unittest.skipIf(main.np is None, "numpy is not installed")
+class FilterPathEquivalenceTest(unittest.TestCase):
+    """The numpy mask and frozenset implementations of the filters must agree."""
+
+    def test_numpy_and_set_paths_agree(self):
+        with_numpy = _filter_results()
+        with mock.patch.object(main, 'np', None):
+            without_numpy = _filter_results()
+        self.assertTrue(any(with_numpy.values()))
+        for key, result in with_numpy.items():
+            with self.subTest(query=key):
+                self.assertEqual(without_numpy[key], result)
+
+
+if __name__ == '__main__':
+    unittest.main()